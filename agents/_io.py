@@ -0,0 +1,54 @@
+import os
+import gzip
+import json
+from typing import Any
+
+# Pick the fastest available JSON backend once at import time
+try:
+    import msgspec
+
+    def _decode(data: bytes) -> Any:
+        return msgspec.json.decode(data)
+
+    def _encode(obj: Any) -> bytes:
+        return msgspec.json.format(msgspec.json.encode(obj), indent=2)
+except ImportError:
+    try:
+        import orjson
+
+        def _decode(data: bytes) -> Any:
+            return orjson.loads(data)
+
+        def _encode(obj: Any) -> bytes:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    except ImportError:
+        def _decode(data: bytes) -> Any:
+            return json.loads(data)
+
+        def _encode(obj: Any) -> bytes:
+            return json.dumps(obj, indent=2).encode()
+
+
+def load_json(path: str) -> Any:
+    """Read and decode a JSON file, decompressing .gz files"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return _decode(gzip.decompress(data) if path.endswith(".gz") else data)
+
+
+def dump_json(obj: Any, path: str, compress: bool = False):
+    """Encode an object and atomically replace the JSON file with it, gzipped when compress is set"""
+    data = _encode(obj)
+    if compress:
+        # Level 1 is nearly free CPU-wise and still shrinks text JSON several times
+        data = gzip.compress(data, compresslevel=1)
+    buf = memoryview(data)
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may write fewer bytes than requested
+        while buf:
+            buf = buf[os.write(fd, buf):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
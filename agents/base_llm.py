@@ -1,10 +1,217 @@
 import os
-from typing import Optional
+import json
+import asyncio
+import functools
+import hashlib
+import threading
+import concurrent.futures
+from typing import Optional, Any, Callable, Tuple, Iterator, AsyncIterator
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+from tenacity import (
+    retry, Retrying, AsyncRetrying, stop_after_attempt, wait_exponential_jitter, retry_if_exception, RetryError
+)
 
 load_dotenv()
 
+class RedisCache(BaseCache):
+    """LLM cache backed by Redis so completions are shared across processes"""
+    
+    def __init__(self, redis_url: str = "redis://localhost:6379/0", ttl: Optional[int] = None):
+        """
+        Initialize the Redis cache
+        
+        Args:
+            redis_url: Redis connection URL
+            ttl: Optional expiry for cached entries in seconds
+        """
+        import redis
+        self.redis = redis.Redis.from_url(redis_url)
+        self.ttl = ttl
+    
+    def _key(self, prompt: str, llm_string: str) -> str:
+        """Build a cache key from the prompt and model configuration"""
+        return "llm_cache:" + hashlib.sha256((prompt + llm_string).encode()).hexdigest()
+    
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Any]:
+        """Return cached generations or None on a miss"""
+        value = self.redis.get(self._key(prompt, llm_string))
+        if value is None:
+            return None
+        return [loads(item) for item in json.loads(value)]
+    
+    def update(self, prompt: str, llm_string: str, return_val: Any) -> None:
+        """Store generations for a prompt"""
+        value = json.dumps([dumps(generation) for generation in return_val])
+        self.redis.set(self._key(prompt, llm_string), value, ex=self.ttl)
+    
+    def clear(self, **kwargs: Any) -> None:
+        """Remove every cached completion"""
+        for key in self.redis.scan_iter("llm_cache:*"):
+            self.redis.delete(key)
+
+
+def _init_semantic_cache(cache_obj: Any, llm_string: str):
+    """Initialize a GPTCache instance that matches semantically similar prompts"""
+    from gptcache.config import Config
+    from gptcache.embedding import Onnx
+    from gptcache.manager import manager_factory
+    from gptcache.processor.pre import get_prompt
+    from gptcache.similarity_evaluation.distance import SearchDistanceEvaluation
+    
+    onnx = Onnx()
+    # Keep a separate index per model configuration
+    digest = hashlib.sha256(llm_string.encode()).hexdigest()[:16]
+    cache_obj.init(
+        pre_embedding_func=get_prompt,
+        embedding_func=onnx.to_embeddings,
+        data_manager=manager_factory(
+            "sqlite,faiss",
+            data_dir=f"outputs/.semantic_cache/{digest}",
+            vector_params={"dimension": onnx.dimension}
+        ),
+        similarity_evaluation=SearchDistanceEvaluation(),
+        config=Config(similarity_threshold=0.95)
+    )
+
+
+_cache_initialized = False
+
+def _init_llm_cache():
+    """Install the global LangChain LLM cache once per process"""
+    global _cache_initialized
+    if _cache_initialized:
+        return
+    
+    # Share completions across processes when Redis is configured
+    redis_url = os.getenv("LLM_CACHE_REDIS_URL")
+    if os.getenv("LLM_SEMANTIC_CACHE"):
+        from langchain_community.cache import GPTCache
+        set_llm_cache(GPTCache(_init_semantic_cache))
+    elif redis_url:
+        set_llm_cache(RedisCache(redis_url))
+    else:
+        set_llm_cache(InMemoryCache())
+    _cache_initialized = True
+
+_init_llm_cache()
+
+@functools.lru_cache(maxsize=1)
+def _resolve_config() -> Tuple[Optional[str], str]:
+    """Resolve the Groq API key and default model, preferring environment variables"""
+    api_key = os.getenv("GROQ_API_KEY")
+    model = os.getenv("GROQ_MODEL")
+    
+    # Only pay for the streamlit import when the environment is incomplete
+    if not api_key or not model:
+        try:
+            import streamlit as st
+            api_key = api_key or st.secrets.get("GROQ_API_KEY")
+            model = model or st.secrets.get("GROQ_MODEL")
+        except Exception:
+            pass
+    
+    return api_key, model or "llama-3.3-70b-versatile"
+
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a Groq error is worth retrying (network, timeout, 429 or 5xx)"""
+    import groq
+    return isinstance(exc, (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError))
+
+# Retry transient failures with jittered exponential backoff; raises RetryError when exhausted
+_RETRY_POLICY = dict(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=1, max=10),
+    retry=retry_if_exception(_is_transient)
+)
+retry_transient = retry(**_RETRY_POLICY)
+
+# Marks an empty stream
+_END = object()
+
+@functools.lru_cache(maxsize=1)
+def fallback_errors() -> Tuple[type, ...]:
+    """
+    Errors after which an agent should return its default result instead of raising
+    
+    Covers exhausted retries, every Groq API error (including non-transient ones such
+    as 400, 401 and 413) and unparseable output; JSON, output-parser and pydantic
+    validation errors all derive from ValueError.
+    """
+    import groq
+    return (RetryError, groq.APIError, ValueError)
+
+@retry_transient
+def invoke_with_retry(runnable: Any, inputs: Any) -> Any:
+    """Invoke a runnable, retrying transient Groq failures"""
+    return runnable.invoke(inputs)
+
+@retry_transient
+async def ainvoke_with_retry(runnable: Any, inputs: Any) -> Any:
+    """Async variant of invoke_with_retry"""
+    return await runnable.ainvoke(inputs)
+
+def stream_with_retry(runnable: Any, inputs: Any) -> Iterator[Any]:
+    """
+    Stream a runnable, retrying transient Groq failures that happen before the first chunk
+    
+    Rate limits and refused connections surface before any token arrives, so they are
+    retried like invoke_with_retry; once a chunk has been yielded the stream cannot be
+    replayed and later errors propagate.
+    """
+    for attempt in Retrying(**_RETRY_POLICY):
+        with attempt:
+            chunks = iter(runnable.stream(inputs))
+            first = next(chunks, _END)
+    
+    if first is not _END:
+        yield first
+        yield from chunks
+
+async def astream_with_retry(runnable: Any, inputs: Any) -> AsyncIterator[Any]:
+    """Async variant of stream_with_retry"""
+    async for attempt in AsyncRetrying(**_RETRY_POLICY):
+        with attempt:
+            chunks = runnable.astream(inputs).__aiter__()
+            first = await anext(chunks, _END)
+    
+    if first is not _END:
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+@functools.lru_cache(maxsize=1)
+def _http_clients() -> Tuple[Any, Any]:
+    """Create the shared keep-alive connection pools reused by every ChatGroq client"""
+    import httpx
+    limits = httpx.Limits(max_keepalive_connections=20, max_connections=40)
+    return (
+        httpx.Client(http2=True, limits=limits, timeout=30.0),
+        httpx.AsyncClient(http2=True, limits=limits, timeout=30.0)
+    )
+
+@functools.lru_cache(maxsize=1)
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """Start the background event loop that owns every pooled async connection"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+    return loop
+
+def run_background(coro: Any) -> concurrent.futures.Future:
+    """Schedule a coroutine on the shared background loop and return its future without waiting"""
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop())
+
+def run_sync(coro: Any) -> Any:
+    """
+    Run a coroutine to completion from synchronous code
+    
+    All coroutines share one long-lived loop, so keep-alive connections in the async
+    pools are never reused from a loop that has already been closed.
+    """
+    return run_background(coro).result()
+
 class BaseLLM:
     """Base LLM wrapper for Groq API"""
     
@@ -16,24 +223,78 @@ class BaseLLM:
             model: Groq model name (defaults to .env or llama-3.3-70b-versatile)
             temperature: Creativity level (0.0 to 1.0)
         """
-        import streamlit as st
-        self.api_key = st.secrets.get("GROQ_API_KEY", os.getenv("GROQ_API_KEY"))
-        self.model = model or st.secrets.get("GROQ_MODEL", os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"))
+        self.api_key, default_model = _resolve_config()
+        self.model = model or default_model
         self.temperature = temperature
         
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables")
         
-        self.llm = ChatGroq(
+        # The client is built on first use by the llm property
+        self._llm_kwargs = dict(
             model=self.model,
             temperature=self.temperature,
-            api_key=self.api_key
+            api_key=self.api_key,
+            streaming=True,
+            # Fail fast and let tenacity own the retry policy
+            timeout=20.0,
+            max_retries=0
+        )
+    
+    @functools.cached_property
+    def llm(self):
+        """ChatGroq client, constructed lazily so idle agents skip the heavy imports"""
+        from langchain_groq import ChatGroq
+        http_client, http_async_client = _http_clients()
+        return ChatGroq(
+            **self._llm_kwargs,
+            http_client=http_client,
+            http_async_client=http_async_client
         )
     
     def generate(self, prompt: str) -> str:
         """Generate a response from the LLM"""
         try:
-            response = self.llm.invoke(prompt)
+            response = invoke_with_retry(self.llm, prompt)
+            return response.content
+        except Exception as e:
+            return f"Error generating response: {e}"
+    
+    def generate_stream(self, prompt: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Generate a response by streaming tokens from the LLM
+        
+        Args:
+            prompt: Prompt to send
+            on_chunk: Optional callback invoked with each chunk as it arrives
+            
+        Returns:
+            The full response text
+        """
+        buf = []
+        try:
+            for chunk in stream_with_retry(self.llm, prompt):
+                buf.append(chunk.content)
+                if on_chunk:
+                    on_chunk(chunk.content)
+            return "".join(buf)
+        except Exception as e:
+            return f"Error generating response: {e}"
+    
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield response text chunks as they arrive; errors propagate to the caller"""
+        for chunk in stream_with_retry(self.llm, prompt):
+            yield chunk.content
+    
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Async variant of stream"""
+        async for chunk in astream_with_retry(self.llm, prompt):
+            yield chunk.content
+    
+    async def agenerate(self, prompt: str) -> str:
+        """Generate a response from the LLM without blocking the event loop"""
+        try:
+            response = await ainvoke_with_retry(self.llm, prompt)
             return response.content
         except Exception as e:
             return f"Error generating response: {e}"
@@ -41,6 +302,21 @@ class BaseLLM:
     def __call__(self, prompt: str) -> str:
         """Make the class callable for convenience"""
         return self.generate(prompt)
+    
+    @classmethod
+    def close(cls):
+        """Close the shared HTTP connection pools on shutdown"""
+        if _http_clients.cache_info().currsize:
+            http_client, http_async_client = _http_clients()
+            http_client.close()
+            run_sync(http_async_client.aclose())
+            _http_clients.cache_clear()
+
+
+@functools.lru_cache(maxsize=8)
+def get_llm(model: Optional[str] = None, temperature: float = 0.7) -> BaseLLM:
+    """Return a shared BaseLLM for the given model and temperature"""
+    return BaseLLM(model=model, temperature=temperature)
 
 
 # Test the class
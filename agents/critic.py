@@ -1,65 +1,132 @@
-import json
-from typing import Dict, Any, List
+import re
 import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from agents.base_llm import BaseLLM
+import copy
+import functools
+import orjson
+from typing import Dict, Any, List, Optional, Callable
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from tenacity import RetryError
+from .base_llm import get_llm, fallback_errors, invoke_with_retry, ainvoke_with_retry, stream_with_retry
+from .schemas import CritiqueResult
+from ._io import load_json, dump_json
+
+# Limits applied when summarizing research for the critique prompt
+MAX_POINTS_PER_FINDING = 3
+MAX_STATISTICS = 5
+MAX_SOURCES = 3
+MAX_GAPS = 3
+
+# Outermost {...} span of an LLM response
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Returned by _extract_json when the response contains no JSON object
+_FALLBACK_CRITIQUE = {
+    "topic": "JSON extraction failed",
+    "validation": {
+        "completeness_score": 5,
+        "accuracy_score": 5,
+        "source_credibility_score": 5,
+        "biases_identified": ["Could not parse critique"],
+        "assumptions": ["Parsing failed"]
+    },
+    "critique": {
+        "strengths": ["Critique system operational"],
+        "weaknesses": ["Could not generate proper critique"],
+        "logical_issues": ["Parsing error"],
+        "missing_perspectives": ["Full critique unavailable"]
+    },
+    "improvements": [{
+        "area": "Critique system",
+        "suggestion": "Retry critique generation",
+        "priority": "high"
+    }],
+    "overall_quality": 5,
+    "confidence_level": "low",
+    "recommendation": "Manual review required"
+}
+_FALLBACK_JSON_STR = orjson.dumps(_FALLBACK_CRITIQUE).decode()
+
+# Static part of the critique returned when the LLM call fails
+_DEFAULT_CRITIQUE = {
+    "validation": {
+        "completeness_score": 5,
+        "accuracy_score": 5,
+        "source_credibility_score": 5,
+        "biases_identified": ["Unknown due to critique failure"],
+        "assumptions": ["Default critique generated"]
+    },
+    "critique": {
+        "strengths": ["Research was conducted", "Findings were documented"],
+        "weaknesses": ["Critique system failed", "Limited validation"],
+        "logical_issues": ["Unable to assess"],
+        "missing_perspectives": ["Full critique unavailable"]
+    },
+    "improvements": [{
+        "area": "Critique System",
+        "suggestion": "Fix critique generation or use manual review",
+        "priority": "high"
+    }],
+    "overall_quality": 5,
+    "confidence_level": "low",
+    "recommendation": "Use with caution and manual verification"
+}
+
+# (key, header) pairs shown by display_critique
+DISPLAY_VALIDATION_SECTIONS = (
+    ('biases_identified', "\n⚠️  Biases Identified:"),
+    ('assumptions', "\n🤔 Assumptions:")
+)
+DISPLAY_CRITIQUE_SECTIONS = (
+    ('strengths', "\n✅ Strengths:"),
+    ('weaknesses', "\n❌ Weaknesses:"),
+    ('logical_issues', "\n🔍 Logical Issues:"),
+    ('missing_perspectives', "\n👁️ Missing Perspectives:")
+)
+
+# Kept short and free of placeholders; the output schema is enforced by CritiqueResult
+CRITIQUE_SYSTEM_PROMPT = """You are an expert critical analyst. Your job is to validate, critique, and improve research findings.
+
+INSTRUCTIONS:
+1. Validate the completeness and accuracy of the findings
+2. Identify biases, assumptions, or logical fallacies
+3. Assess source credibility and potential conflicts
+4. Suggest improvements or additional research needed
+5. Rate the overall quality (1-10 scale)
+
+Return only JSON matching the CritiqueResult schema: topic, validation (completeness_score, accuracy_score and source_credibility_score from 1-10, biases_identified, assumptions), critique (strengths, weaknesses, logical_issues, missing_perspectives), improvements (area, suggestion, priority high/medium/low), overall_quality from 1-10, confidence_level high/medium/low, recommendation."""
+
 class CriticAgent:
     """Agent that validates, critiques, and improves research findings"""
     
-    def __init__(self, model: str = None, temperature: float = 0.4):
+    def __init__(self, model: str = None, temperature: float = 0.4,
+                 on_chunk: Optional[Callable[[str], None]] = None):
         """
         Initialize the Critic Agent
         
         Args:
             model: LLM model to use
             temperature: Lower temperature for critical analysis
+            on_chunk: Optional callback that receives streamed tokens
         """
-        self.llm = BaseLLM(model=model, temperature=temperature)
+        self.llm = get_llm(model, temperature)
+        self.on_chunk = on_chunk
         
-        # Critique prompt template
-        self.critique_prompt = """You are an expert critical analyst. Your job is to validate, critique, and improve research findings.
-
-RESEARCH TOPIC: {topic}
-
-RESEARCH FINDINGS:
-{findings}
-
-INSTRUCTIONS:
-1. Validate the completeness and accuracy of the findings
-2. Identify biases, assumptions, or logical fallacies
-3. Assess source credibility and potential conflicts
-4. Suggest improvements or additional research needed
-5. Rate the overall quality (1-10 scale)
-6. Output in JSON format:
-{{
-    "topic": "Research topic",
-    "validation": {{
-        "completeness_score": 1-10,
-        "accuracy_score": 1-10,
-        "source_credibility_score": 1-10,
-        "biases_identified": ["bias 1", "bias 2", ...],
-        "assumptions": ["assumption 1", "assumption 2", ...]
-    }},
-    "critique": {{
-        "strengths": ["strength 1", "strength 2", ...],
-        "weaknesses": ["weakness 1", "weakness 2", ...],
-        "logical_issues": ["issue 1", "issue 2", ...],
-        "missing_perspectives": ["perspective 1", "perspective 2", ...]
-    }},
-    "improvements": [
-        {{
-            "area": "Area needing improvement",
-            "suggestion": "Specific suggestion",
-            "priority": "high/medium/low"
-        }}
-    ],
-    "overall_quality": 1-10,
-    "confidence_level": "high/medium/low",
-    "recommendation": "Overall recommendation for use"
-}}
-
-OUTPUT ONLY VALID JSON:"""
+        # Critique prompt: stable instructions in the system message, research in the user message
+        self.critique_prompt = ChatPromptTemplate.from_messages([
+            ("system", CRITIQUE_SYSTEM_PROMPT),
+            ("human", "RESEARCH TOPIC: {topic}\n\nRESEARCH FINDINGS:\n{findings}")
+        ])
+    
+    @functools.cached_property
+    def chain(self):
+        """Prompt piped into the model as plain text, compiled on first use"""
+        return self.critique_prompt | self.llm.llm | StrOutputParser()
+    
+    @functools.cached_property
+    def structured_chain(self):
+        """Prompt piped into the model with output enforced to match CritiqueResult"""
+        return self.critique_prompt | self.llm.llm.with_structured_output(CritiqueResult)
     
     def critique_research(self, research: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -71,98 +138,131 @@ OUTPUT ONLY VALID JSON:"""
         Returns:
             Critique analysis
         """
-        # Prepare findings summary
-        findings_summary = self._prepare_findings_summary(research)
-        
-        # Create prompt
-        prompt = self.critique_prompt.format(
-            topic=research.get("topic", "Unknown topic"),
-            findings=findings_summary
-        )
+        inputs = self._build_inputs(research)
         
         try:
-            # Get critique from LLM
-            response = self.llm(prompt)
+            # Get critique from LLM, streaming tokens when a callback is set
+            if self.on_chunk:
+                critique = self._parse_json("".join(self._stream_chunks(inputs)))
+            else:
+                critique = self._invoke_structured(inputs)
             
-            # Extract JSON
-            json_str = self._extract_json(response)
+            return self._add_metadata(critique, research)
             
-            # Parse JSON
-            critique = json.loads(json_str)
+        except fallback_errors() as e:
+            print(f"Critique error: {e}")
+            return self._create_default_critique(research)
+    
+    async def acritique_research(self, research: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Critique research findings without blocking the event loop
+        
+        Args:
+            research: Research results from ResearchAgent
             
-            # Add metadata
-            critique["research_topic"] = research.get("topic", "")
-            critique["original_research_summary"] = research.get("summary", "")
+        Returns:
+            Critique analysis
+        """
+        inputs = self._build_inputs(research)
+        
+        try:
+            # Get critique from LLM
+            critique = await self._ainvoke_structured(inputs)
             
-            return critique
+            return self._add_metadata(critique, research)
             
-        except Exception as e:
+        except fallback_errors() as e:
             print(f"Critique error: {e}")
             return self._create_default_critique(research)
     
+    def _build_inputs(self, research: Dict[str, Any]) -> Dict[str, str]:
+        """Build the critique prompt variables for a research result"""
+        # Prepare findings summary
+        findings_summary = self._prepare_findings_summary(research)
+        
+        return {
+            "topic": research.get("topic", "Unknown topic"),
+            "findings": findings_summary
+        }
+    
+    def _invoke_structured(self, inputs: Dict[str, str]) -> Dict[str, Any]:
+        """Get a schema-validated critique, falling back to JSON extraction"""
+        try:
+            return invoke_with_retry(self.structured_chain, inputs).model_dump()
+        except RetryError:
+            raise
+        except Exception as e:
+            print(f"Structured critique failed, extracting JSON instead: {e}")
+            return self._parse_json(invoke_with_retry(self.chain, inputs))
+    
+    async def _ainvoke_structured(self, inputs: Dict[str, str]) -> Dict[str, Any]:
+        """Async variant of _invoke_structured"""
+        try:
+            return (await ainvoke_with_retry(self.structured_chain, inputs)).model_dump()
+        except RetryError:
+            raise
+        except Exception as e:
+            print(f"Structured critique failed, extracting JSON instead: {e}")
+            return self._parse_json(await ainvoke_with_retry(self.chain, inputs))
+    
+    def _stream_chunks(self, inputs: Dict[str, str]):
+        """Yield streamed response chunks, forwarding each to on_chunk"""
+        for chunk in stream_with_retry(self.chain, inputs):
+            self.on_chunk(chunk)
+            yield chunk
+    
+    def _parse_json(self, response: str) -> Dict[str, Any]:
+        """Parse a raw LLM text response into a critique dictionary"""
+        # Extract JSON
+        json_str = self._extract_json(response)
+        
+        # Parse JSON
+        return orjson.loads(json_str)
+    
+    def _add_metadata(self, critique: Dict[str, Any], research: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach the originating research details to a critique"""
+        critique["research_topic"] = research.get("topic", "")
+        critique["original_research_summary"] = research.get("summary", "")
+        
+        return critique
+    
     def _prepare_findings_summary(self, research: Dict[str, Any]) -> str:
         """Prepare a summary of research findings for the critique"""
-        summary_parts = []
-        
-        summary_parts.append(f"SUMMARY: {research.get('summary', 'No summary')}")
+        summary_parts = [f"SUMMARY: {research.get('summary', 'No summary')}"]
         
-        if research.get('key_findings'):
+        key_findings = research.get('key_findings')
+        if key_findings:
             summary_parts.append("\nKEY FINDINGS:")
-            for finding in research['key_findings']:
-                summary_parts.append(f"- {finding['category']}:")
-                for point in finding.get('points', [])[:3]:  # Limit to 3 points per category
-                    summary_parts.append(f"  • {point}")
+            summary_parts.extend(
+                "\n".join([f"- {finding['category']}:"] +
+                          [f"  • {point}" for point in finding.get('points', [])[:MAX_POINTS_PER_FINDING]])
+                for finding in key_findings
+            )
         
-        if research.get('statistics'):
+        statistics = research.get('statistics')
+        if statistics:
             summary_parts.append("\nSTATISTICS:")
-            for stat in research['statistics'][:5]:  # Limit to 5 stats
-                summary_parts.append(f"- {stat}")
+            summary_parts.extend(f"- {stat}" for stat in statistics[:MAX_STATISTICS])
         
-        if research.get('sources'):
+        sources = research.get('sources')
+        if sources:
             summary_parts.append("\nSOURCES:")
-            for source in research['sources'][:3]:  # Limit to 3 sources
-                summary_parts.append(f"- {source.get('title', 'No title')} ({source.get('credibility', 'unknown')})")
+            summary_parts.extend(
+                f"- {source.get('title', 'No title')} ({source.get('credibility', 'unknown')})"
+                for source in sources[:MAX_SOURCES]
+            )
         
-        if research.get('gaps'):
+        gaps = research.get('gaps')
+        if gaps:
             summary_parts.append("\nIDENTIFIED GAPS:")
-            for gap in research['gaps'][:3]:  # Limit to 3 gaps
-                summary_parts.append(f"- {gap}")
+            summary_parts.extend(f"- {gap}" for gap in gaps[:MAX_GAPS])
         
         return "\n".join(summary_parts)
     
     def _extract_json(self, text: str) -> str:
         """Extract JSON from LLM response"""
-        start = text.find('{')
-        end = text.rfind('}') + 1
-        
-        if start >= 0 and end > start:
-            return text[start:end]
-        else:
-            # Fallback structure
-            return json.dumps({
-                "topic": "JSON extraction failed",
-                "validation": {
-                    "completeness_score": 5,
-                    "accuracy_score": 5,
-                    "source_credibility_score": 5,
-                    "biases_identified": ["Could not parse critique"],
-                    "assumptions": ["Parsing failed"]
-                },
-                "critique": {
-                    "strengths": ["Critique system operational"],
-                    "weaknesses": ["Could not generate proper critique"],
-                    "logical_issues": ["Parsing error"],
-                    "missing_perspectives": ["Full critique unavailable"]
-                },
-                "improvements": [{
-                    "area": "Critique system",
-                    "suggestion": "Retry critique generation",
-                    "priority": "high"
-                }],
-                "overall_quality": 5,
-                "confidence_level": "low",
-                "recommendation": "Manual review required"
-            })
+        match = _JSON_RE.search(text)
+        return match.group(0) if match else _FALLBACK_JSON_STR
     
     def _create_default_critique(self, research: Dict[str, Any]) -> Dict[str, Any]:
         """Create default critique if LLM fails"""
@@ -170,100 +270,64 @@ OUTPUT ONLY VALID JSON:"""
             "topic": research.get("topic", "Unknown"),
             "research_topic": research.get("topic", ""),
             "original_research_summary": research.get("summary", ""),
-            "validation": {
-                "completeness_score": 5,
-                "accuracy_score": 5,
-                "source_credibility_score": 5,
-                "biases_identified": ["Unknown due to critique failure"],
-                "assumptions": ["Default critique generated"]
-            },
-            "critique": {
-                "strengths": ["Research was conducted", "Findings were documented"],
-                "weaknesses": ["Critique system failed", "Limited validation"],
-                "logical_issues": ["Unable to assess"],
-                "missing_perspectives": ["Full critique unavailable"]
-            },
-            "improvements": [{
-                "area": "Critique System",
-                "suggestion": "Fix critique generation or use manual review",
-                "priority": "high"
-            }],
-            "overall_quality": 5,
-            "confidence_level": "low",
-            "recommendation": "Use with caution and manual verification"
+            **copy.deepcopy(_DEFAULT_CRITIQUE)
         }
     
     def display_critique(self, critique: Dict[str, Any]):
         """Display critique in readable format"""
-        print("\n" + "="*60)
-        print("🎯 CRITIQUE REPORT")
-        print("="*60)
-        print(f"Topic: {critique.get('topic', 'Unknown')}")
+        lines = ["\n" + "="*60, "🎯 CRITIQUE REPORT", "="*60, f"Topic: {critique.get('topic', 'Unknown')}"]
         
         # Validation scores
-        validation = critique.get('validation', {})
+        validation = critique.get('validation') or {}
         if validation:
-            print(f"\n📊 VALIDATION SCORES:")
-            print(f"   Completeness: {validation.get('completeness_score', 'N/A')}/10")
-            print(f"   Accuracy: {validation.get('accuracy_score', 'N/A')}/10")
-            print(f"   Source Credibility: {validation.get('source_credibility_score', 'N/A')}/10")
-            
-            if validation.get('biases_identified'):
-                print(f"\n⚠️  Biases Identified:")
-                for bias in validation['biases_identified'][:3]:  # Limit display
-                    print(f"   • {bias}")
-            
-            if validation.get('assumptions'):
-                print(f"\n🤔 Assumptions:")
-                for assumption in validation['assumptions'][:3]:  # Limit display
-                    print(f"   • {assumption}")
+            lines += [
+                "\n📊 VALIDATION SCORES:",
+                f"   Completeness: {validation.get('completeness_score', 'N/A')}/10",
+                f"   Accuracy: {validation.get('accuracy_score', 'N/A')}/10",
+                f"   Source Credibility: {validation.get('source_credibility_score', 'N/A')}/10"
+            ]
+            self._append_bullets(lines, validation, DISPLAY_VALIDATION_SECTIONS)
         
         # Critique details
-        critique_details = critique.get('critique', {})
+        critique_details = critique.get('critique') or {}
         if critique_details:
-            print(f"\n📝 CRITIQUE:")
-            
-            if critique_details.get('strengths'):
-                print(f"\n✅ Strengths:")
-                for strength in critique_details['strengths'][:3]:
-                    print(f"   • {strength}")
-            
-            if critique_details.get('weaknesses'):
-                print(f"\n❌ Weaknesses:")
-                for weakness in critique_details['weaknesses'][:3]:
-                    print(f"   • {weakness}")
-            
-            if critique_details.get('logical_issues'):
-                print(f"\n🔍 Logical Issues:")
-                for issue in critique_details['logical_issues'][:3]:
-                    print(f"   • {issue}")
-            
-            if critique_details.get('missing_perspectives'):
-                print(f"\n👁️ Missing Perspectives:")
-                for perspective in critique_details['missing_perspectives'][:3]:
-                    print(f"   • {perspective}")
+            lines.append("\n📝 CRITIQUE:")
+            self._append_bullets(lines, critique_details, DISPLAY_CRITIQUE_SECTIONS)
         
         # Improvements
-        improvements = critique.get('improvements', [])
+        improvements = critique.get('improvements') or []
         if improvements:
-            print(f"\n🚀 SUGGESTED IMPROVEMENTS:")
+            lines.append("\n🚀 SUGGESTED IMPROVEMENTS:")
             for improvement in improvements[:3]:  # Limit display
-                print(f"   • [{improvement.get('priority', 'medium').upper()}] {improvement.get('area')}:")
-                print(f"     {improvement.get('suggestion', 'No suggestion')}")
+                priority = improvement.get('priority', 'medium').upper()
+                lines.append(f"   • [{priority}] {improvement.get('area')}:")
+                lines.append(f"     {improvement.get('suggestion', 'No suggestion')}")
         
         # Overall assessment
-        print(f"\n📈 OVERALL ASSESSMENT:")
-        print(f"   Quality Score: {critique.get('overall_quality', 'N/A')}/10")
-        print(f"   Confidence: {critique.get('confidence_level', 'unknown').upper()}")
-        print(f"   Recommendation: {critique.get('recommendation', 'No recommendation')}")
-
+        lines += [
+            "\n📈 OVERALL ASSESSMENT:",
+            f"   Quality Score: {critique.get('overall_quality', 'N/A')}/10",
+            f"   Confidence: {critique.get('confidence_level', 'unknown').upper()}",
+            f"   Recommendation: {critique.get('recommendation', 'No recommendation')}"
+        ]
+        
+        # One write instead of a print per line
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    @staticmethod
+    def _append_bullets(lines: List[str], section: Dict[str, Any], headers):
+        """Append up to three bullets for each non-empty list in a section"""
+        for key, header in headers:
+            items = section.get(key)
+            if items:
+                lines.append(header)
+                lines.extend(f"   • {item}" for item in items[:3])  # Limit display
 
 # Test the Critic Agent
 if __name__ == "__main__":
     # First, let's load the test research from file
     try:
-        with open("examples/test_research.json", "r") as f:
-            test_research = json.load(f)
+        test_research = load_json("examples/test_research.json")
     except FileNotFoundError:
         print("Test research file not found. Creating sample research...")
         test_research = {
@@ -293,6 +357,5 @@ if __name__ == "__main__":
     critic.display_critique(critique)
     
     # Save critique to file
-    with open("examples/test_critique.json", "w") as f:
-        json.dump(critique, f, indent=2)
+    dump_json(critique, "examples/test_critique.json")
     print("\n✅ Critique saved to 'examples/test_critique.json'") 
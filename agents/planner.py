@@ -1,27 +1,63 @@
-import json
-from typing import List, Dict, Any
+import re
 import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from agents.base_llm import BaseLLM
+import copy
+import functools
+import orjson
+from typing import List, Dict, Any, Optional, Callable
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from tenacity import RetryError
+from .base_llm import get_llm, fallback_errors, invoke_with_retry, stream_with_retry
+from .schemas import PlanResult
+from ._io import dump_json
 
-class TaskPlanner:
-    """Agent that breaks down complex problems into actionable subtasks"""
-    
-    def __init__(self, model: str = None, temperature: float = 0.3):
-        """
-        Initialize the Task Planner
-        
-        Args:
-            model: LLM model to use
-            temperature: Lower temperature for more structured planning
-        """
-        self.llm = BaseLLM(model=model, temperature=temperature)
-        
-        # Planning prompt template
-        self.planning_prompt = """You are an expert task planner. Your job is to break down complex problems into clear, actionable subtasks.
+# Outermost {...} span of an LLM response
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
 
-USER PROBLEM: {problem}
+# Returned by _extract_json when the response contains no JSON object
+_FALLBACK_PLAN = {
+    "problem": "Parsing failed",
+    "subtasks": [{
+        "id": 1,
+        "task": "Handle parsing error",
+        "agent": "system",
+        "tools": [],
+        "expected_output": "Error message"
+    }],
+    "rationale": "JSON parsing failed from LLM response"
+}
+_FALLBACK_JSON_STR = orjson.dumps(_FALLBACK_PLAN).decode()
+
+# Static part of the plan returned when the LLM call fails
+_DEFAULT_PLAN = {
+    "subtasks": [
+        {
+            "id": 1,
+            "task": "Research and gather information about the problem",
+            "agent": "researcher",
+            "tools": ["web_search"],
+            "expected_output": "Collection of relevant information and sources"
+        },
+        {
+            "id": 2,
+            "task": "Analyze the gathered information",
+            "agent": "analyst",
+            "tools": [],
+            "expected_output": "Analysis of pros, cons, and insights"
+        },
+        {
+            "id": 3,
+            "task": "Validate the analysis and provide recommendations",
+            "agent": "critic",
+            "tools": [],
+            "expected_output": "Validated insights and actionable recommendations"
+        }
+    ],
+    "rationale": "Default three-step research pipeline"
+}
+
+# Invariant planning instructions, sent as the system message so the prompt prefix is stable across calls
+PLANNING_SYSTEM_PROMPT = """You are an expert task planner. Your job is to break down complex problems into clear, actionable subtasks.
 
 INSTRUCTIONS:
 1. Analyze the problem and identify the key components
@@ -44,6 +80,38 @@ INSTRUCTIONS:
 }}
 
 OUTPUT ONLY VALID JSON:"""
+
+class TaskPlanner:
+    """Agent that breaks down complex problems into actionable subtasks"""
+    
+    def __init__(self, model: str = None, temperature: float = 0.3,
+                 on_chunk: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the Task Planner
+        
+        Args:
+            model: LLM model to use
+            temperature: Lower temperature for more structured planning
+            on_chunk: Optional callback that receives streamed tokens
+        """
+        self.llm = get_llm(model, temperature)
+        self.on_chunk = on_chunk
+        
+        # Planning prompt: stable instructions in the system message, problem in the user message
+        self.prompt_template = ChatPromptTemplate.from_messages([
+            ("system", PLANNING_SYSTEM_PROMPT),
+            ("human", "USER PROBLEM: {problem}")
+        ])
+    
+    @functools.cached_property
+    def chain(self):
+        """Prompt piped into the model as plain text, compiled on first use"""
+        return self.prompt_template | self.llm.llm | StrOutputParser()
+    
+    @functools.cached_property
+    def structured_chain(self):
+        """Prompt piped into the model with output enforced to match PlanResult"""
+        return self.prompt_template | self.llm.llm.with_structured_output(PlanResult)
     
     def create_plan(self, problem: str) -> Dict[str, Any]:
         """
@@ -55,49 +123,53 @@ OUTPUT ONLY VALID JSON:"""
         Returns:
             Dictionary containing the task breakdown
         """
-        prompt = self.planning_prompt.format(problem=problem)
+        inputs = {"problem": problem}
         
         try:
-            # Get response from LLM
-            response = self.llm(prompt)
-            
-            # Extract JSON from response
-            json_str = self._extract_json(response)
-            
-            # Parse JSON
-            plan = json.loads(json_str)
+            # Get plan from LLM, streaming tokens when a callback is set
+            if self.on_chunk:
+                plan = self._parse_json("".join(self._stream_chunks(inputs)))
+            else:
+                plan = self._invoke_structured(inputs)
             
             # Validate structure
             self._validate_plan(plan)
             
             return plan
             
-        except Exception as e:
+        except fallback_errors() as e:
             print(f"Error creating plan: {e}")
             # Return a simple default plan if parsing fails
             return self._create_default_plan(problem)
     
+    def _invoke_structured(self, inputs: Dict[str, str]) -> Dict[str, Any]:
+        """Get a schema-validated plan, falling back to JSON extraction"""
+        try:
+            return invoke_with_retry(self.structured_chain, inputs).model_dump()
+        except RetryError:
+            raise
+        except Exception as e:
+            print(f"Structured plan failed, extracting JSON instead: {e}")
+            return self._parse_json(invoke_with_retry(self.chain, inputs))
+    
+    def _parse_json(self, response: str) -> Dict[str, Any]:
+        """Parse a raw LLM text response into a plan dictionary"""
+        # Extract JSON from response
+        json_str = self._extract_json(response)
+        
+        # Parse JSON
+        return orjson.loads(json_str)
+    
+    def _stream_chunks(self, inputs: Dict[str, str]):
+        """Yield streamed response chunks, forwarding each to on_chunk"""
+        for chunk in stream_with_retry(self.chain, inputs):
+            self.on_chunk(chunk)
+            yield chunk
+    
     def _extract_json(self, text: str) -> str:
         """Extract JSON from LLM response"""
-        # Find JSON start and end
-        start = text.find('{')
-        end = text.rfind('}') + 1
-        
-        if start >= 0 and end > start:
-            return text[start:end]
-        else:
-            # If no JSON found, wrap the text in a basic structure
-            return json.dumps({
-                "problem": "Parsing failed",
-                "subtasks": [{
-                    "id": 1,
-                    "task": "Handle parsing error",
-                    "agent": "system",
-                    "tools": [],
-                    "expected_output": "Error message"
-                }],
-                "rationale": "JSON parsing failed from LLM response"
-            })
+        match = _JSON_RE.search(text)
+        return match.group(0) if match else _FALLBACK_JSON_STR
     
     def _validate_plan(self, plan: Dict[str, Any]):
         """Validate the plan structure"""
@@ -111,50 +183,31 @@ OUTPUT ONLY VALID JSON:"""
     
     def _create_default_plan(self, problem: str) -> Dict[str, Any]:
         """Create a default plan if LLM fails"""
-        return {
-            "problem": problem,
-            "subtasks": [
-                {
-                    "id": 1,
-                    "task": "Research and gather information about the problem",
-                    "agent": "researcher",
-                    "tools": ["web_search"],
-                    "expected_output": "Collection of relevant information and sources"
-                },
-                {
-                    "id": 2,
-                    "task": "Analyze the gathered information",
-                    "agent": "analyst",
-                    "tools": [],
-                    "expected_output": "Analysis of pros, cons, and insights"
-                },
-                {
-                    "id": 3,
-                    "task": "Validate the analysis and provide recommendations",
-                    "agent": "critic",
-                    "tools": [],
-                    "expected_output": "Validated insights and actionable recommendations"
-                }
-            ],
-            "rationale": "Default three-step research pipeline"
-        }
+        return {"problem": problem, **copy.deepcopy(_DEFAULT_PLAN)}
     
     def display_plan(self, plan: Dict[str, Any]):
         """Display the plan in a readable format"""
-        print("\n" + "="*60)
-        print("📋 TASK PLAN")
-        print("="*60)
-        print(f"Problem: {plan['problem']}")
-        print(f"\nRationale: {plan['rationale']}")
-        print("\nSubtasks:")
-        print("-"*60)
+        lines = [
+            "\n" + "="*60,
+            "📋 TASK PLAN",
+            "="*60,
+            f"Problem: {plan['problem']}",
+            f"\nRationale: {plan['rationale']}",
+            "\nSubtasks:",
+            "-"*60
+        ]
         
         for task in plan["subtasks"]:
-            print(f"\n{task['id']}. {task['task']}")
-            print(f"   🤖 Agent: {task['agent']}")
-            print(f"   🛠️  Tools: {', '.join(task['tools']) if task['tools'] else 'None'}")
-            print(f"   📄 Output: {task['expected_output']}")
-
+            tools = task['tools']
+            lines += [
+                f"\n{task['id']}. {task['task']}",
+                f"   🤖 Agent: {task['agent']}",
+                f"   🛠️  Tools: {', '.join(tools) if tools else 'None'}",
+                f"   📄 Output: {task['expected_output']}"
+            ]
+        
+        # One write instead of a print per line
+        sys.stdout.write("\n".join(lines) + "\n")
 
 # Test the Task Planner
 if __name__ == "__main__":
@@ -170,6 +223,5 @@ if __name__ == "__main__":
     planner.display_plan(plan)
     
     # Save plan to file
-    with open("examples/test_plan.json", "w") as f:
-        json.dump(plan, f, indent=2)
+    dump_json(plan, "examples/test_plan.json")
     print("\n✅ Plan saved to 'examples/test_plan.json'") 
@@ -1,35 +1,93 @@
-import json
+import re
 import os
-from typing import List, Dict, Any
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import asyncio
+import functools
+import hashlib
+import orjson
+from typing import List, Dict, Any, Optional, Iterable, AsyncIterable
 from dotenv import load_dotenv
-from agents.base_llm import BaseLLM
+from .base_llm import get_llm
+from memory.llm_cache import LLMCache, DiskCacheBackend
+from ._io import dump_json
+
+try:
+    from duckduckgo_search import DDGS
+except ImportError:
+    DDGS = None
 
 load_dotenv()
 
-class ResearchAgent:
-    """Agent that performs web research using SERP API (Google Search)"""
+SERP_ENDPOINT = "https://serpapi.com/search.json"
+
+# How long search results stay cached (seconds)
+SEARCH_CACHE_TTL = 3600 * 6
+
+# Outermost {...} span of an LLM response
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Returned by _extract_json when the response contains no JSON object
+_FALLBACK_RESEARCH = {
+    "topic": "JSON extraction failed",
+    "summary": "Could not parse LLM response",
+    "key_findings": [],
+    "statistics": [],
+    "sources": [],
+    "gaps": ["Could not parse analysis"],
+    "next_steps": ["Retry research"]
+}
+_FALLBACK_JSON_STR = orjson.dumps(_FALLBACK_RESEARCH).decode()
+
+@functools.lru_cache(maxsize=1)
+def _load_serp_key() -> Optional[str]:
+    """Resolve the SerpAPI key, preferring the environment over Streamlit secrets"""
+    api_key = os.getenv("SERP_API_KEY")
     
-    def __init__(self, model: str = None, temperature: float = 0.7):
-        """
-        Initialize the Research Agent
-        
-        Args:
-            model: LLM model to use
-            temperature: Creativity level for analysis
-        """
-        self.llm = BaseLLM(model=model, temperature=temperature)
-        import streamlit as st
-        self.serp_api_key = st.secrets.get("SERP_API_KEY", os.getenv("SERP_API_KEY"))
-        
-        # Research prompt template
-        self.research_prompt = """You are an expert research analyst. Analyze the provided search results and create a comprehensive summary.
+    # Only pay for the streamlit import when the environment is incomplete
+    if not api_key:
+        try:
+            import streamlit as st
+            api_key = st.secrets.get("SERP_API_KEY")
+        except Exception:
+            pass
+    
+    return api_key
 
-RESEARCH TOPIC: {topic}
+@functools.lru_cache(maxsize=512)
+def _optimize_query_cached(query: str) -> str:
+    """Add the year for recency and cap the query length; memoized since plans repeat queries"""
+    # Keep original query exactly as user typed, only add 2024 if no year is present
+    lowered = query.lower()
+    if "2024" not in lowered and "2023" not in lowered:
+        query = f"{query} 2024"
+    
+    # If query is too long, use first 12 words
+    words = query.split()
+    if len(words) > 15:
+        return " ".join(words[:12])
+    return query
 
-SEARCH RESULTS:
-{search_results}
+def _topic_key(topic: str) -> str:
+    """Dedup key for a research topic: the full topic, lower-cased with whitespace collapsed"""
+    return " ".join(topic.lower().split())
+
+@functools.lru_cache(maxsize=1)
+def _serp_session():
+    """Shared keep-alive session so SerpAPI calls reuse TCP and TLS connections"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+    return session
+
+@functools.lru_cache(maxsize=1)
+def _serp_async_client():
+    """Shared async SerpAPI pool; only used from the loop managed by base_llm.run_sync"""
+    import httpx
+    return httpx.AsyncClient(limits=httpx.Limits(max_connections=16), timeout=30.0)
+
+# Invariant instructions come first so every research call shares the same prompt prefix
+RESEARCH_PROMPT = """You are an expert research analyst. Analyze the provided search results and create a comprehensive summary.
 
 INSTRUCTIONS:
 1. Extract key insights from the search results
@@ -60,7 +118,93 @@ INSTRUCTIONS:
     "next_steps": ["Recommended follow-up research"]
 }}
 
+RESEARCH TOPIC: {topic}
+
+SEARCH RESULTS:
+{search_results}
+
 OUTPUT ONLY VALID JSON:"""
+
+def _normalize_research(research: Dict[str, Any], topic: str,
+                        raw_results: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Give parsed research every expected key so downstream code can index it directly"""
+    return {
+        **research,
+        "topic": research.get("topic") or topic,
+        "summary": research.get("summary") or "",
+        "key_findings": research.get("key_findings") or [],
+        "statistics": research.get("statistics") or [],
+        "sources": research.get("sources") or [],
+        "gaps": research.get("gaps") or [],
+        "next_steps": research.get("next_steps") or [],
+        "raw_results": raw_results
+    }
+
+class _JsonObjectScanner:
+    """Incrementally find the first top-level JSON object in streamed text"""
+    
+    def __init__(self):
+        self.parts: List[str] = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume a chunk and return the complete object once its closing brace arrives"""
+        start = 0
+        if self.depth == 0:
+            # Skip any prose before the object opens
+            start = chunk.find('{')
+            if start < 0:
+                return None
+        
+        for i in range(start, len(chunk)):
+            ch = chunk[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                self.depth += 1
+            elif ch == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.parts.append(chunk[start:i + 1])
+                    return "".join(self.parts)
+        
+        self.parts.append(chunk[start:])
+        return None
+    
+    def text(self) -> str:
+        """Everything consumed since the object opened"""
+        return "".join(self.parts)
+
+class ResearchAgent:
+    """Agent that performs web research using SERP API (Google Search)"""
+    
+    def __init__(self, model: str = None, temperature: float = 0.7, cache_dir: str = "outputs"):
+        """
+        Initialize the Research Agent
+        
+        Args:
+            model: LLM model to use
+            temperature: Creativity level for analysis
+            cache_dir: Folder holding the .llm_cache and .serp_cache databases
+        """
+        self.llm = get_llm(model, temperature)
+        # Persist analyses so repeated topics skip the LLM call entirely
+        self.cache = LLMCache(DiskCacheBackend(os.path.join(cache_dir, ".llm_cache")))
+        # Repeated queries are answered from disk instead of the network
+        self.serp_cache = DiskCacheBackend(os.path.join(cache_dir, ".serp_cache"), ttl=SEARCH_CACHE_TTL)
+        self.serp_api_key = _load_serp_key()
+        
+        # Research prompt template
+        self.research_prompt = RESEARCH_PROMPT
     
     def search_web(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
         """
@@ -78,46 +222,103 @@ OUTPUT ONLY VALID JSON:"""
             return self._fallback_search(query, max_results)
         
         try:
-            from serpapi.google_search import GoogleSearch
+            params = self._build_serp_params(query, max_results)
+            key = self._serp_key(params)
+            raw = self.serp_cache.get(key)
+            cached = raw is not None
+            if not cached:
+                response = _serp_session().get(SERP_ENDPOINT, params=params, timeout=10)
+                response.raise_for_status()
+                raw = response.json()
+                self._store_serp_response(key, raw)
             
-            # Use simple optimization
-            optimized_query = self._optimize_query(query)
-            # If query is too long, use first 10 words
-            if len(optimized_query.split()) > 15:
-                optimized_query = " ".join(optimized_query.split()[:12])
-            print(f"🔍 Searching: {optimized_query[:80]}...")
-            
-            params = {
-                "q": optimized_query,
-                "api_key": self.serp_api_key,
-                "num": max_results,
-                "engine": "google"
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            search_results = []
-            if "organic_results" in results:
-                for item in results["organic_results"][:max_results]:
-                    search_results.append({
-                        "title": item.get("title", ""),
-                        "snippet": item.get("snippet", ""),
-                        "url": item.get("link", "")
-                    })
-            
-            print(f"✅ Found {len(search_results)} results")
+            search_results = self._parse_serp_results(raw, max_results)
+            print(f"✅ Found {len(search_results)} {'cached ' if cached else ''}results")
             return search_results
             
         except Exception as e:
             print(f"❌ SERP API error: {e}")
             return self._fallback_search(query, max_results)
     
+    async def search_web_async(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+        """Non-blocking variant of search_web that calls SerpAPI's JSON endpoint directly"""
+        if not self.serp_api_key:
+            print("❌ SERP_API_KEY not found in environment variables")
+            return await asyncio.to_thread(self._fallback_search, query, max_results)
+        
+        try:
+            params = self._build_serp_params(query, max_results)
+            key = self._serp_key(params)
+            raw = self.serp_cache.get(key)
+            cached = raw is not None
+            if not cached:
+                response = await _serp_async_client().get(SERP_ENDPOINT, params=params)
+                response.raise_for_status()
+                raw = response.json()
+                self._store_serp_response(key, raw)
+            
+            search_results = self._parse_serp_results(raw, max_results)
+            print(f"✅ Found {len(search_results)} {'cached ' if cached else ''}results")
+            return search_results
+        
+        except Exception as e:
+            print(f"❌ SERP API error: {e}")
+            return await asyncio.to_thread(self._fallback_search, query, max_results)
+    
+    def _build_serp_params(self, query: str, max_results: int) -> Dict[str, Any]:
+        """Build the SerpAPI request parameters for a query"""
+        # Use simple optimization
+        optimized_query = self._optimize_query(query)
+        print(f"🔍 Searching: {optimized_query[:80]}...")
+        
+        return {
+            "q": optimized_query,
+            "api_key": self.serp_api_key,
+            "num": max_results,
+            "engine": "google"
+        }
+    
+    @staticmethod
+    def _search_key(query: str, max_results: int, engine: str) -> str:
+        """Cache key for a search request"""
+        return hashlib.sha1(f"{query}|{max_results}|{engine}".encode()).hexdigest()
+    
+    @staticmethod
+    def _serp_key(params: Dict[str, Any]) -> str:
+        """Cache key for a SerpAPI request: a SHA-256 of every parameter except the API key"""
+        request = {name: value for name, value in params.items() if name != "api_key"}
+        return "serp:" + hashlib.sha256(orjson.dumps(request, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    def _store_serp_response(self, key: str, raw: Dict[str, Any]):
+        """Cache a raw SerpAPI response once the search completed, including searches with no results"""
+        if raw.get("search_metadata", {}).get("status") == "Success":
+            self.serp_cache.set(key, raw)
+    
+    def _parse_serp_results(self, results: Dict[str, Any], max_results: int) -> List[Dict[str, str]]:
+        """Convert a SerpAPI response into title/snippet/url results"""
+        search_results = []
+        if "organic_results" in results:
+            for item in results["organic_results"][:max_results]:
+                search_results.append({
+                    "title": item.get("title", ""),
+                    "snippet": item.get("snippet", ""),
+                    "url": item.get("link", "")
+                })
+        return search_results
+    
     def _fallback_search(self, query: str, max_results: int) -> List[Dict[str, str]]:
         """Fallback search using DuckDuckGo"""
         try:
             print(f"🔄 Trying DuckDuckGo fallback: {query}")
-            from duckduckgo_search import DDGS
+            key = self._search_key(query, max_results, "duckduckgo")
+            cached = self.serp_cache.get(key)
+            if cached is not None:
+                print(f"✅ Fallback found {len(cached)} cached results")
+                return cached
+            
+            if DDGS is None:
+                print("❌ Fallback search unavailable: duckduckgo_search is not installed")
+                return []
             ddgs = DDGS()
             
             results = []
@@ -130,6 +331,8 @@ OUTPUT ONLY VALID JSON:"""
                     "url": result.get("href", "")
                 })
             
+            if results:
+                self.serp_cache.set(key, results)
             print(f"✅ Fallback found {len(results)} results")
             return results
             
@@ -139,28 +342,14 @@ OUTPUT ONLY VALID JSON:"""
     
     def _optimize_query(self, query: str) -> str:
         """Simple universal query optimizer"""
-        # Keep original query exactly as user typed
-        # Just add year for recency
-        
-        query_lower = query.lower().strip()
-        
-        # Only add 2024 if not already present
-        if "2024" not in query_lower and "2023" not in query_lower:
-            return f"{query} 2024"
-        
-        return query  # Return original unchanged
+        return _optimize_query_cached(query)
     
     def format_search_results(self, results: List[Dict[str, str]]) -> str:
         """Format search results for the LLM prompt"""
-        formatted = []
-        for i, result in enumerate(results, 1):
-            formatted.append(f"RESULT {i}:")
-            formatted.append(f"Title: {result['title']}")
-            formatted.append(f"Snippet: {result['snippet'][:300]}...")
-            formatted.append(f"URL: {result['url']}")
-            formatted.append("---")
-        
-        return "\n".join(formatted)
+        return "\n".join(
+            f"RESULT {i}:\nTitle: {result['title']}\nSnippet: {result['snippet'][:300]}...\nURL: {result['url']}\n---"
+            for i, result in enumerate(results, 1)
+        )
     
     def research_topic(self, topic: str, search_query: str = None) -> Dict[str, Any]:
         """
@@ -187,52 +376,137 @@ OUTPUT ONLY VALID JSON:"""
         
         print(f"✅ Processing {len(search_results)} search results")
         
+        prompt = self._build_prompt(topic, search_results)
+        key = self._response_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self._analyze_response(topic, search_results, cached)
+        return self._analyze_response(topic, search_results, self._generate(prompt), cache_key=key)
+    
+    async def research_topic_async(self, topic: str, search_query: str = None) -> Dict[str, Any]:
+        """Non-blocking variant of research_topic so several topics can be researched concurrently"""
+        query = search_query or topic
+        
+        print(f"📚 Researching topic: {topic}")
+        
+        search_results = await self.search_web_async(query)
+        
+        if not search_results:
+            print("⚠️ No search results found")
+            return self._create_empty_research(topic)
+        
+        print(f"✅ Processing {len(search_results)} search results")
+        
+        prompt = self._build_prompt(topic, search_results)
+        key = self._response_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self._analyze_response(topic, search_results, cached)
+        return self._analyze_response(topic, search_results, await self._agenerate(prompt), cache_key=key)
+    
+    def start_research(self, topics: List[str]) -> List["asyncio.Future[Dict[str, Any]]"]:
+        """
+        Start researching every topic concurrently without waiting for the results
+        
+        Must be called from a running event loop. Topics that differ only in case or
+        whitespace share one future, so callers can chain work onto each topic as it completes.
+        
+        Args:
+            topics: Topics to research
+            
+        Returns:
+            One future per topic, in the same order as the input
+        """
+        futures: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        for topic in topics:
+            key = _topic_key(topic)
+            if key not in futures:
+                futures[key] = asyncio.ensure_future(self.research_topic_async(topic))
+        
+        if len(futures) < len(topics):
+            print(f"♻️ Merged {len(topics) - len(futures)} duplicate research queries")
+        
+        return [futures[_topic_key(topic)] for topic in topics]
+    
+    def _response_key(self, prompt: str) -> str:
+        """Cache key for the LLM analysis of a prompt"""
+        return LLMCache.cache_key(self.llm.model, prompt, self.llm.temperature)
+    
+    def _generate(self, prompt: str) -> str:
+        """Get the JSON analysis for a prompt from the LLM"""
+        try:
+            # Stop reading as soon as the JSON object closes
+            return self._extract_json_stream(self.llm.stream(prompt))
+        except Exception as e:
+            return f"Error generating response: {e}"
+    
+    async def _agenerate(self, prompt: str) -> str:
+        """Async variant of _generate"""
+        try:
+            return await self._aextract_json_stream(self.llm.astream(prompt))
+        except Exception as e:
+            return f"Error generating response: {e}"
+    
+    def _build_prompt(self, topic: str, search_results: List[Dict[str, str]]) -> str:
+        """Fill the research prompt with the topic and formatted search results"""
         # Format results for LLM
         formatted_results = self.format_search_results(search_results)
         
-        # Create prompt
-        prompt = self.research_prompt.format(
+        return self.research_prompt.format(
             topic=topic,
             search_results=formatted_results
         )
+    
+    def _analyze_response(self, topic: str, search_results: List[Dict[str, str]],
+                          response: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse the LLM analysis and attach the raw search results
         
+        A fresh response is cached under cache_key only once it has parsed into research, so
+        failed calls, responses without JSON and truncated objects are retried next time.
+        """
         try:
-            # Get analysis from LLM
-            response = self.llm(prompt)
-            
             # Extract JSON
             json_str = self._extract_json(response)
             
-            # Parse JSON
-            research = json.loads(json_str)
+            # Parse JSON; stdlib json also accepts NaN/Infinity, which orjson rejects
+            try:
+                research = orjson.loads(json_str)
+            except orjson.JSONDecodeError:
+                research = json.loads(json_str)
             
-            # Add raw search results
-            research["raw_results"] = search_results
-            
-            return research
+            # Fill in missing keys and add raw search results
+            normalized = _normalize_research(research, topic, search_results)
+            if cache_key is not None and json_str != _FALLBACK_JSON_STR:
+                self.cache.set(cache_key, response)
+            return normalized
             
         except Exception as e:
             print(f"Analysis error: {e}")
             return self._create_basic_research(topic, search_results)
     
+    def _extract_json_stream(self, chunks: Iterable[str]) -> str:
+        """Extract JSON from streamed LLM output without waiting for trailing tokens"""
+        scanner = _JsonObjectScanner()
+        for chunk in chunks:
+            obj = scanner.feed(chunk)
+            if obj is not None:
+                return obj
+        return self._extract_json(scanner.text())
+    
+    async def _aextract_json_stream(self, chunks: AsyncIterable[str]) -> str:
+        """Async variant of _extract_json_stream"""
+        scanner = _JsonObjectScanner()
+        async for chunk in chunks:
+            obj = scanner.feed(chunk)
+            if obj is not None:
+                return obj
+        return self._extract_json(scanner.text())
+    
     def _extract_json(self, text: str) -> str:
         """Extract JSON from LLM response"""
-        start = text.find('{')
-        end = text.rfind('}') + 1
-        
-        if start >= 0 and end > start:
-            return text[start:end]
-        else:
-            # Fallback structure
-            return json.dumps({
-                "topic": "JSON extraction failed",
-                "summary": "Could not parse LLM response",
-                "key_findings": [],
-                "statistics": [],
-                "sources": [],
-                "gaps": ["Could not parse analysis"],
-                "next_steps": ["Retry research"]
-            })
+        match = _JSON_RE.search(text)
+        return match.group(0) if match else _FALLBACK_JSON_STR
     
     def _create_empty_research(self, topic: str) -> Dict[str, Any]:
         """Create empty research structure"""
@@ -308,7 +582,7 @@ OUTPUT ONLY VALID JSON:"""
             for step in research['next_steps']:
                 print(f"   • {step}")
         
-        print(f"\n📊 Raw results: {len(research.get('raw_results', []))} items")
+        print(f"\n📊 Raw results: {len(research['raw_results'])} items")
 
 
 # Test the Research Agent
@@ -327,6 +601,5 @@ if __name__ == "__main__":
     
     # Save research to file
     os.makedirs("examples", exist_ok=True)
-    with open("examples/test_research_serp.json", "w") as f:
-        json.dump(research, f, indent=2)
+    dump_json(research, "examples/test_research_serp.json")
     print("\n✅ Research saved to 'examples/test_research_serp.json'")
\ No newline at end of file
@@ -0,0 +1,53 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class Validation(BaseModel):
+    """Validation scores for a piece of research"""
+    completeness_score: int = Field(description="Completeness score from 1 to 10")
+    accuracy_score: int = Field(description="Accuracy score from 1 to 10")
+    source_credibility_score: int = Field(description="Source credibility score from 1 to 10")
+    biases_identified: List[str] = Field(description="Biases found in the research")
+    assumptions: List[str] = Field(description="Assumptions the research relies on")
+
+
+class CritiqueDetails(BaseModel):
+    """Qualitative critique of the research"""
+    strengths: List[str]
+    weaknesses: List[str]
+    logical_issues: List[str]
+    missing_perspectives: List[str]
+
+
+class Improvement(BaseModel):
+    """A suggested improvement to the research"""
+    area: str = Field(description="Area needing improvement")
+    suggestion: str = Field(description="Specific suggestion")
+    priority: str = Field(description="high, medium or low")
+
+
+class CritiqueResult(BaseModel):
+    """Structured output of the CriticAgent"""
+    topic: str = Field(description="Research topic")
+    validation: Validation
+    critique: CritiqueDetails
+    improvements: List[Improvement]
+    overall_quality: int = Field(description="Overall quality from 1 to 10")
+    confidence_level: str = Field(description="high, medium or low")
+    recommendation: str = Field(description="Overall recommendation for use")
+
+
+class Subtask(BaseModel):
+    """A single step of a task plan"""
+    id: int
+    task: str = Field(description="Specific task description")
+    agent: str = Field(description="Which agent should handle this (researcher, analyst, critic, etc.)")
+    tools: List[str] = Field(description="Tools needed")
+    expected_output: str = Field(description="What this task should produce")
+
+
+class PlanResult(BaseModel):
+    """Structured output of the TaskPlanner"""
+    problem: str = Field(description="Original problem")
+    subtasks: List[Subtask]
+    rationale: str = Field(description="Brief explanation of why you chose this breakdown")
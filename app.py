@@ -1,11 +1,26 @@
-import json
 import os
+import queue
+import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional, Iterator, Tuple
 
 from agents.planner import TaskPlanner
 from agents.researcher import ResearchAgent
 from agents.critic import CriticAgent
+from agents.base_llm import run_sync, run_background
+from agents._io import dump_json
+
+# Subtask agents whose work is handed to the ResearchAgent
+RESEARCH_AGENTS = ("researcher", "analyst", "data_scientist", "cultural expert", "accreditation expert", "decision analyst", "validator")
+
+# Research files are gzipped once their raw search results exceed this many characters
+RAW_RESULTS_GZIP_THRESHOLD = 20_000
+
+# Called with (stage, percent) as each agent finishes: planner, researcher, critic, reporter
+ProgressCallback = Callable[[str, int], None]
+
+# Removes characters that are invalid in filenames and replaces spaces with underscores
+_FILENAME_TABLE = str.maketrans({" ": "_", **dict.fromkeys('<>:"/\\|?*.\n\r\t')})
 
 class AutoAnalyst:
     """Main orchestrator for the Auto-Analyst system"""
@@ -19,16 +34,41 @@ class AutoAnalyst:
         # Create output directory
         os.makedirs("outputs", exist_ok=True)
     
-    def analyze(self, problem: str) -> Dict[str, Any]:
+    def analyze(self, problem: str, progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """
         Main analysis pipeline
         
         Args:
             problem: User's problem/query
+            progress_callback: Optional callback invoked with (stage, percent) as each agent finishes;
+                it runs on the background event loop thread
             
         Returns:
             Complete analysis report
         """
+        return run_sync(self.analyze_async(problem, progress_callback))
+    
+    def analyze_stream(self, problem: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Run the analysis pipeline, yielding events as each agent finishes
+        
+        Yields (stage, percent) for the planner, researcher, critic and reporter stages,
+        then ("done", report). Events are yielded on the caller's thread, so UIs can
+        update directly from the loop; errors are raised from the final step.
+        """
+        events = queue.Queue()
+        future = run_background(self.analyze_async(problem, lambda stage, pct: events.put((stage, pct))))
+        future.add_done_callback(lambda _: events.put(None))
+        
+        while (event := events.get()) is not None:
+            yield event
+        yield "done", future.result()
+    
+    async def analyze_async(self, problem: str,
+                            progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Analysis pipeline that researches and critiques every subtask concurrently"""
+        notify = progress_callback or (lambda stage, pct: None)
+        
         print("🤖 AUTO-ANALYST SYSTEM")
         print("=" * 60)
         print(f"Problem: {problem}")
@@ -37,58 +77,70 @@ class AutoAnalyst:
         # Step 1: Create task plan
         print("\n📋 STEP 1: Task Planning")
         print("-" * 40)
-        plan = self.planner.create_plan(problem)
+        plan = await asyncio.to_thread(self.planner.create_plan, problem)
         self.planner.display_plan(plan)
+        notify("planner", 30)
         
         # Step 2: Execute research tasks
         print("\n🔍 STEP 2: Research Execution")
         print("-" * 40)
         
-        all_research = []
-        for task in plan["subtasks"]:
-            if task["agent"].lower() in ["researcher", "analyst", "data_scientist", "cultural expert", "accreditation expert", "decision analyst", "validator"]:
-                print(f"\n📊 Researching: {task['task']}")
-                research = self.researcher.research_topic(task["task"])
-                self.researcher.display_research(research)
-                all_research.append({
-                    "task_id": task["id"],
-                    "task_description": task["task"],
-                    "research": research
-                })
-          # If no research was done, research the main topic
-        if not all_research:
+        research_tasks = [(task["id"], task["task"]) for task in plan["subtasks"] if task["agent"].lower() in RESEARCH_AGENTS]
+        # If no subtask needs research, research the main topic
+        if not research_tasks:
             print("⚠️ Researching main topic instead...")
-            research = self.researcher.research_topic(problem)
+            research_tasks = [(0, problem)]
+        for _, description in research_tasks:
+            print(f"\n📊 Researching: {description}")
+        
+        # Each critique starts as soon as its own research finishes, overlapping with slower searches
+        research_futures = self.researcher.start_research([description for _, description in research_tasks])
+        critique_futures = {}
+        for future in research_futures:
+            if future not in critique_futures:
+                critique_futures[future] = asyncio.ensure_future(self._critique_when_ready(future))
+        
+        results = await asyncio.gather(*research_futures)
+        
+        all_research = []
+        for (task_id, description), research in zip(research_tasks, results):
+            self.researcher.display_research(research)
             all_research.append({
-                "task_id": 0,
-                "task_description": problem,
+                "task_id": task_id,
+                "task_description": description,
                 "research": research
-            })       
+            })
+        notify("researcher", 60)
         
         # Step 3: Critique the findings
         print("\n🎯 STEP 3: Critical Analysis")
         print("-" * 40)
         
-        all_critiques = []
         for research_item in all_research:
             print(f"\n🔍 Critiquing research for Task {research_item['task_id']}")
-            critique = self.critic.critique_research(research_item["research"])
+        critiques = await asyncio.gather(*(critique_futures[future] for future in research_futures))
+        
+        all_critiques = []
+        for research_item, critique in zip(all_research, critiques):
             self.critic.display_critique(critique)
             all_critiques.append({
                 "task_id": research_item["task_id"],
                 "critique": critique
             })
+        notify("critic", 85)
         
         # Step 4: Generate final report
         print("\n📄 STEP 4: Final Report Generation")
         print("-" * 40)
         
-        final_report = self._generate_final_report(
+        final_report = await asyncio.to_thread(
+            self._generate_final_report,
             problem=problem,
             plan=plan,
             research_items=all_research,
             critiques=all_critiques
         )
+        notify("reporter", 100)
         
         # Save everything
         self._save_analysis(
@@ -101,33 +153,53 @@ class AutoAnalyst:
         
         return final_report
     
+    async def _critique_when_ready(self, research_future: "asyncio.Future[Dict[str, Any]]") -> Dict[str, Any]:
+        """Critique a piece of research once it has finished"""
+        return await self.critic.acritique_research(await research_future)
+    
     def _generate_final_report(self, problem: str, plan: Dict, 
                               research_items: list, critiques: list) -> Dict[str, Any]:
         """Generate the final comprehensive report"""
         
                 # Create proper combined research for critique
-        combined_research = {
-            "topic": f"Comprehensive analysis: {problem}",
-            "summary": "",
-            "key_findings": [],
-            "sources": [],
-            "statistics": []
-        }
+        summary_parts = []
+        combined_findings = []
+        combined_sources = []
+        combined_statistics = []
+        detailed_findings = []
         
-        # Combine actual data from all research
+        # Combine actual data from all research and build the per-task findings in one pass
         for item in research_items:
             research = item.get("research", {})
-            if research.get("summary"):
-                combined_research["summary"] += f"Task {item['task_id']}: {research['summary']} "
-            if research.get("key_findings"):
-                combined_research["key_findings"].extend(research["key_findings"][:2])
+            summary = research.get("summary", "")
+            top_findings = research.get("key_findings", [])[:2]  # Top 2 points
+            if summary:
+                summary_parts.append(f"Task {item['task_id']}: {summary} ")
+            combined_findings.extend(top_findings)
             if research.get("statistics"):
-                combined_research["statistics"].extend(research["statistics"][:3])
+                combined_statistics.extend(research["statistics"][:3])
             if research.get("sources"):
-                combined_research["sources"].extend(research["sources"][:2])
+                combined_sources.extend(research["sources"][:2])
+            detailed_findings.append({
+                "task_id": item["task_id"],
+                "task": item["task_description"],
+                "research_summary": summary,
+                "key_points": top_findings
+            })
+        
+        combined_research = {
+            "topic": f"Comprehensive analysis: {problem}",
+            "summary": "".join(summary_parts),
+            "key_findings": combined_findings,
+            "sources": combined_sources,
+            "statistics": combined_statistics
+        }
         
         # Get overall critique
         overall_critique = self.critic.critique_research(combined_research)
+        crit = overall_critique.get("critique") or {}
+        confidence = overall_critique.get("confidence_level", "medium")
+        improvements = overall_critique.get("improvements", [])
         
         # Generate recommendations
         recommendations = self._generate_recommendations(plan, research_items, critiques)
@@ -147,7 +219,7 @@ class AutoAnalyst:
                 "problem_statement": problem,
                 "key_insights": self._extract_key_insights(research_items),
                 "overall_quality_score": max(6, overall_critique.get("overall_quality", 7)),
-                "confidence_level": overall_critique.get("confidence_level", "medium"),
+                "confidence_level": confidence,
                 "top_recommendation": recommendations[0] if recommendations else "No clear recommendation"
             },
             "methodology": {
@@ -155,20 +227,12 @@ class AutoAnalyst:
                 "agents_used": ["TaskPlanner", "ResearchAgent", "CriticAgent"],
                 "tools_used": ["Groq LLM", "DuckDuckGo Search"]
             },
-            "detailed_findings": [
-                {
-                    "task_id": item["task_id"],
-                    "task": item["task_description"],
-                    "research_summary": item["research"].get("summary", ""),
-                    "key_points": item["research"].get("key_findings", [])[:2]  # Top 2 points
-                }
-                for item in research_items
-            ],
+            "detailed_findings": detailed_findings,
             "critical_assessment": {
                 "overall_score": overall_critique.get("overall_quality", 5),
-                "strengths": overall_critique.get("critique", {}).get("strengths", []),
-                "weaknesses": overall_critique.get("critique", {}).get("weaknesses", []),
-                "improvement_suggestions": overall_critique.get("improvements", [])
+                "strengths": crit.get("strengths", []),
+                "weaknesses": crit.get("weaknesses", []),
+                "improvement_suggestions": improvements
             },
             "recommendations": recommendations,
             "next_steps": self._generate_next_steps(critiques)
@@ -267,16 +331,9 @@ class AutoAnalyst:
         # Create timestamp for filenames
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Create safe filename - remove all invalid characters
-        safe_problem = problem.strip()  # Remove leading/trailing whitespace including newlines
-        # Replace multiple spaces with single space
-        safe_problem = ' '.join(safe_problem.split())
-        # Remove invalid filename characters
-        invalid_chars = '<>:"/\\|?*.\n\r\t'
-        for char in invalid_chars:
-            safe_problem = safe_problem.replace(char, '')
-        # Replace spaces with underscores and limit length
-        safe_problem = safe_problem.replace(' ', '_')[:50]
+        # Create safe filename: collapse whitespace, then drop invalid characters and
+        # turn spaces into underscores in a single pass
+        safe_problem = ' '.join(problem.split()).translate(_FILENAME_TABLE)[:50]
         
         # Ensure outputs directory exists
         os.makedirs("outputs", exist_ok=True)
@@ -289,48 +346,58 @@ class AutoAnalyst:
             "final_report": final_report
         }
         
+        # Every research item embeds its raw search results, so compress them when they get large
+        raw_size = sum(
+            len(r.get("title", "")) + len(r.get("snippet", "")) + len(r.get("url", ""))
+            for item in research_items
+            for r in item.get("research", {}).get("raw_results", [])
+        )
+        compress_research = raw_size > RAW_RESULTS_GZIP_THRESHOLD
+        
         for name, data in components.items():
-            filename = f"outputs/{timestamp}_{safe_problem}_{name}.json"
+            compress = compress_research and name == "research"
+            ext = ".json.gz" if compress else ".json"
+            filename = f"outputs/{timestamp}_{safe_problem}_{name}{ext}"
             try:
-                with open(filename, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                dump_json(data, filename, compress=compress)
                 print(f"  ✅ Saved {name}: {filename}")
             except Exception as e:
                 print(f"  ❌ Error saving {name}: {e}")
                 # Try a simpler filename as fallback
-                simple_filename = f"outputs/{timestamp}_{name}.json"
-                with open(simple_filename, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                simple_filename = f"outputs/{timestamp}_{name}{ext}"
+                dump_json(data, simple_filename, compress=compress)
                 print(f"  ✅ Saved with simple name: {simple_filename}")
         
         # Also save a simple text summary
         try:
             text_filename = f"outputs/{timestamp}_{safe_problem}_summary.txt"
+            exec_summary = final_report['executive_summary']
+            parts = [
+                "AUTO-ANALYST REPORT\n",
+                "="*50 + "\n",
+                f"Problem: {problem}\n",
+                f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+                "\nEXECUTIVE SUMMARY:\n",
+                "-"*30 + "\n",
+                f"{exec_summary['problem_statement']}\n\n",
+                "Key Insights:\n"
+            ]
+            parts.extend(f"• {insight}\n" for insight in exec_summary['key_insights'])
+            parts += [
+                f"\nOverall Quality: {exec_summary['overall_quality_score']}/10\n",
+                f"Confidence: {exec_summary['confidence_level'].upper()}\n",
+                "\nTOP RECOMMENDATION:\n",
+                f"{exec_summary['top_recommendation']}\n",
+                "\nRECOMMENDATIONS:\n",
+                "-"*30 + "\n"
+            ]
+            parts.extend(f"{i}. {rec}\n" for i, rec in enumerate(final_report['recommendations'], 1))
+            parts += ["\nNEXT STEPS:\n", "-"*30 + "\n"]
+            parts.extend(f"{i}. {step}\n" for i, step in enumerate(final_report['next_steps'], 1))
+            
+            # Build the whole summary first and write it in one call
             with open(text_filename, "w", encoding="utf-8") as f:
-                f.write(f"AUTO-ANALYST REPORT\n")
-                f.write(f"="*50 + "\n")
-                f.write(f"Problem: {problem}\n")
-                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"\nEXECUTIVE SUMMARY:\n")
-                f.write(f"-"*30 + "\n")
-                f.write(f"{final_report['executive_summary']['problem_statement']}\n\n")
-                f.write(f"Key Insights:\n")
-                for insight in final_report['executive_summary']['key_insights']:
-                    f.write(f"• {insight}\n")
-                f.write(f"\nOverall Quality: {final_report['executive_summary']['overall_quality_score']}/10\n")
-                f.write(f"Confidence: {final_report['executive_summary']['confidence_level'].upper()}\n")
-                f.write(f"\nTOP RECOMMENDATION:\n")
-                f.write(f"{final_report['executive_summary']['top_recommendation']}\n")
-                
-                f.write(f"\nRECOMMENDATIONS:\n")
-                f.write(f"-"*30 + "\n")
-                for i, rec in enumerate(final_report['recommendations'], 1):
-                    f.write(f"{i}. {rec}\n")
-                
-                f.write(f"\nNEXT STEPS:\n")
-                f.write(f"-"*30 + "\n")
-                for i, step in enumerate(final_report['next_steps'], 1):
-                    f.write(f"{i}. {step}\n")
+                f.write("".join(parts))
             
             print(f"  ✅ Saved text summary: {text_filename}")
         except Exception as e:
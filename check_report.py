@@ -1,9 +1,10 @@
-import json
 import os
+import ijson
+import orjson
 
-# List all report files
+# List all report files, skipping leftovers from interrupted atomic writes
 files = os.listdir('outputs')
-final_reports = [f for f in files if 'final_report' in f]
+final_reports = [f for f in files if 'final_report' in f and not f.endswith('.tmp')]
 
 if not final_reports:
     print("❌ No final reports found")
@@ -13,21 +14,37 @@ if not final_reports:
 latest = max(final_reports)
 print(f"📁 Latest report: {latest}")
 
-# Load and inspect
-with open(f'outputs/{latest}', 'r') as f:
-    data = json.load(f)
+# One streaming pass over parse events: only executive_summary is built into an object,
+# the other top-level values are skipped and recommendations are counted item by item
+keys = []
+exec_summary = None
+rec_count = 0
+with open(f'outputs/{latest}', 'rb') as f:
+    builder = None
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if prefix == '' and event == 'map_key':
+            keys.append(value)
+        elif prefix == 'recommendations.item' and event not in ('end_map', 'end_array'):
+            rec_count += 1
+        elif prefix == 'executive_summary' and event == 'start_map':
+            builder = ijson.ObjectBuilder()
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == 'executive_summary' and event == 'end_map':
+                exec_summary = builder.value
+                builder = None
 
 print("\n🔍 Report Structure:")
-print(f"Keys: {list(data.keys())}")
+print(f"Keys: {keys}")
 
-if 'executive_summary' in data:
+if exec_summary is not None:
     print(f"\n📊 Executive Summary:")
-    print(f"  Quality score: {data['executive_summary'].get('overall_quality_score', 'MISSING')}")
-    print(f"  Confidence: {data['executive_summary'].get('confidence_level', 'MISSING')}")
-    print(f"  Recommendations count: {len(data.get('recommendations', []))}")
+    print(f"  Quality score: {exec_summary.get('overall_quality_score', 'MISSING')}")
+    print(f"  Confidence: {exec_summary.get('confidence_level', 'MISSING')}")
+    print(f"  Recommendations count: {rec_count}")
     
     # Show full executive summary
     print(f"\n📋 Full executive_summary:")
-    print(json.dumps(data['executive_summary'], indent=2))
+    print(orjson.dumps(exec_summary, option=orjson.OPT_INDENT_2).decode())
 else:
     print("❌ NO executive_summary in report") 
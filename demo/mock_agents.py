@@ -3,64 +3,107 @@ Mock agents for demo mode
 """
 
 import time
-from typing import Dict, List, Any
-from mock_data import MockDataGenerator
+import queue
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Awaitable, Tuple, Optional, Iterator
+try:
+    from .mock_data import MockDataGenerator, MockPlan, MockResearch, MockCritique
+except ImportError:
+    # Running the module directly as a script from the demo folder
+    from mock_data import MockDataGenerator, MockPlan, MockResearch, MockCritique
+
+# Signatures of the injectable delay functions; tests can pass no-ops
+SleepFn = Callable[[float], None]
+AsyncSleepFn = Callable[[float], Awaitable[None]]
+
+# Called with (stage, percent) as each agent finishes, matching AutoAnalyst's progress callback
+ProgressCallback = Callable[[str, int], None]
+
 class MockTaskPlanner:
     """Mock task planner for demo mode"""
     
-    def __init__(self):
-        self.generator = MockDataGenerator()
+    def __init__(self, speed_factor: float = 1.0, sleep_fn: SleepFn = time.sleep,
+                 async_sleep_fn: AsyncSleepFn = asyncio.sleep):
+        self.speed_factor = speed_factor
+        self._sleep = sleep_fn
+        self._asleep = async_sleep_fn
     
-    def create_plan(self, problem: str) -> Dict[str, Any]:
+    def create_plan(self, problem: str) -> MockPlan:
         """Create mock plan with simulated delay"""
-        time.sleep(1)  # Simulate processing time
-        return self.generator.generate_mock_plan(problem)
+        self._sleep(1 * self.speed_factor)  # Simulate processing time
+        return MockDataGenerator.generate_mock_plan(problem)
     
-    def display_plan(self, plan: Dict[str, Any]):
+    async def create_plan_async(self, problem: str) -> MockPlan:
+        """Create mock plan without blocking the event loop"""
+        await self._asleep(1 * self.speed_factor)  # Simulate processing time
+        return MockDataGenerator.generate_mock_plan(problem)
+    
+    def display_plan(self, plan: MockPlan):
         """Display plan (mock version)"""
-        print(f"\n📋 Plan: {plan['problem'][:50]}...")
-        print(f"   Tasks: {len(plan['subtasks'])}")
+        print(f"\n📋 Plan: {plan.problem[:50]}...")
+        print(f"   Tasks: {len(plan.subtasks)}")
 
 class MockResearchAgent:
     """Mock research agent for demo mode"""
     
-    def __init__(self):
-        self.generator = MockDataGenerator()
+    def __init__(self, speed_factor: float = 1.0, sleep_fn: SleepFn = time.sleep,
+                 async_sleep_fn: AsyncSleepFn = asyncio.sleep):
+        self.speed_factor = speed_factor
+        self._sleep = sleep_fn
+        self._asleep = async_sleep_fn
     
-    def research_topic(self, topic: str, search_query: str = None) -> Dict[str, Any]:
+    def research_topic(self, topic: str, search_query: str = None) -> MockResearch:
         """Generate mock research with simulated delay"""
-        time.sleep(2)  # Simulate search time
-        return self.generator.generate_mock_research(topic)
+        self._sleep(2 * self.speed_factor)  # Simulate search time
+        return MockDataGenerator.generate_mock_research(topic)
+    
+    async def research_topic_async(self, topic: str, search_query: str = None) -> MockResearch:
+        """Generate mock research without blocking the event loop"""
+        await self._asleep(2 * self.speed_factor)  # Simulate search time
+        return MockDataGenerator.generate_mock_research(topic)
     
-    def display_research(self, research: Dict[str, Any]):
+    def display_research(self, research: MockResearch):
         """Display research (mock version)"""
-        print(f"\n🔍 Research: {research['topic'][:50]}...")
-        print(f"   Sources: {len(research.get('sources', []))}")
+        print(f"\n🔍 Research: {research.topic[:50]}...")
+        print(f"   Sources: {len(research.sources)}")
 
 class MockCriticAgent:
     """Mock critic agent for demo mode"""
     
-    def __init__(self):
-        self.generator = MockDataGenerator()
+    def __init__(self, speed_factor: float = 1.0, sleep_fn: SleepFn = time.sleep,
+                 async_sleep_fn: AsyncSleepFn = asyncio.sleep):
+        self.speed_factor = speed_factor
+        self._sleep = sleep_fn
+        self._asleep = async_sleep_fn
     
-    def critique_research(self, research: Dict[str, Any]) -> Dict[str, Any]:
+    def critique_research(self, research: MockResearch) -> MockCritique:
         """Generate mock critique with simulated delay"""
-        time.sleep(1)  # Simulate analysis time
-        return self.generator.generate_mock_critique(research)
+        self._sleep(1 * self.speed_factor)  # Simulate analysis time
+        return MockDataGenerator.generate_mock_critique(research)
+    
+    async def acritique_research(self, research: MockResearch) -> MockCritique:
+        """Generate mock critique without blocking the event loop"""
+        await self._asleep(1 * self.speed_factor)  # Simulate analysis time
+        return MockDataGenerator.generate_mock_critique(research)
     
-    def display_critique(self, critique: Dict[str, Any]):
+    def display_critique(self, critique: MockCritique):
         """Display critique (mock version)"""
-        print(f"\n🎯 Critique: Score {critique['overall_quality']}/10")
+        print(f"\n🎯 Critique: Score {critique.overall_quality}/10")
 
 class MockAutoAnalyst:
     """Complete mock analyst for demo mode"""
     
-    def __init__(self, speed: str = "normal"):
+    def __init__(self, speed: str = "normal", sleep_fn: SleepFn = time.sleep,
+                 async_sleep_fn: AsyncSleepFn = asyncio.sleep, max_parallel: int = 8):
         """
         Initialize mock analyst
         
         Args:
             speed: 'fast' (3s), 'normal' (6s), or 'realistic' (12s)
+            sleep_fn: Blocking delay used by the synchronous agent methods
+            async_sleep_fn: Awaitable delay used by the async pipeline
+            max_parallel: Maximum number of subtasks processed at once
         """
         self.speeds = {
             "fast": 0.5,
@@ -69,82 +112,119 @@ class MockAutoAnalyst:
         }
         self.speed_factor = self.speeds.get(speed, 1.0)
         
-        self.planner = MockTaskPlanner()
-        self.researcher = MockResearchAgent()
-        self.critic = MockCriticAgent()
-        self.generator = MockDataGenerator()
+        self._asleep = async_sleep_fn
+        self.max_parallel = max_parallel
+        
+        # The agents own the simulated delays, scaled by the speed factor
+        self.planner = MockTaskPlanner(self.speed_factor, sleep_fn, async_sleep_fn)
+        self.researcher = MockResearchAgent(self.speed_factor, sleep_fn, async_sleep_fn)
+        self.critic = MockCriticAgent(self.speed_factor, sleep_fn, async_sleep_fn)
     
-    def analyze(self, problem: str) -> Dict[str, Any]:
+    def analyze(self, problem: str, progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """
         Run complete mock analysis pipeline
         
         Args:
             problem: User's problem
+            progress_callback: Optional callback invoked with (stage, percent) as each agent finishes
             
         Returns:
             Complete mock report
         """
+        return asyncio.run(self.analyze_async(problem, progress_callback))
+    
+    def analyze_stream(self, problem: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Run the mock pipeline, yielding events as each agent finishes
+        
+        Yields (stage, percent) for the planner, researcher, critic and reporter stages,
+        then ("done", result) with the same result analyze() returns.
+        """
+        events = queue.Queue()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(self.analyze, problem, lambda stage, pct: events.put((stage, pct)))
+            future.add_done_callback(lambda _: events.put(None))
+            
+            while (event := events.get()) is not None:
+                yield event
+            yield "done", future.result()
+    
+    async def analyze_async(self, problem: str,
+                            progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Mock analysis pipeline that researches and critiques every subtask concurrently"""
+        notify = progress_callback or (lambda stage, pct: None)
         print(f"🚀 Starting mock analysis: {problem[:50]}...")
         
         # Step 1: Planning
-        time.sleep(1 * self.speed_factor)
-        plan = self.planner.create_plan(problem)
-        
-        # Step 2: Research
-        research_items = []
-        for task in plan["subtasks"]:
-            time.sleep(2 * self.speed_factor)
-            research = self.researcher.research_topic(task["task"])
-            research_items.append({
-                "task_id": task["id"],
-                "task_description": task["task"],
-                "research": research
-            })
+        plan = await self.planner.create_plan_async(problem)
+        subtasks = plan.subtasks
+        notify("planner", 30)
         
-        # Step 3: Critique
-        critiques = []
-        for item in research_items:
-            time.sleep(1 * self.speed_factor)
-            critique = self.critic.critique_research(item["research"])
-            critiques.append({
-                "task_id": item["task_id"],
-                "critique": critique
-            })
+        # Steps 2-3: Research and critique each subtask in one pass
+        # The semaphore is created per run because analyze() starts a fresh event loop each call
+        sem = asyncio.Semaphore(self.max_parallel)
+        pairs = await asyncio.gather(*(self._research_and_critique(task, sem) for task in subtasks))
+        research_items, critiques = map(list, zip(*pairs)) if pairs else ([], [])
+        notify("researcher", 60)
+        notify("critic", 85)
         
         # Step 4: Final report
-        time.sleep(1 * self.speed_factor)
-        final_report = self.generator.generate_mock_report(
+        await self._asleep(1 * self.speed_factor)
+        total_time = 4 + len(subtasks) * 3 * self.speed_factor
+        final_report = MockDataGenerator.generate_mock_report(
             problem, plan, research_items, critiques
         )
+        notify("reporter", 100)
         
+        # Records become plain dicts only here, at the UI/JSON boundary
         return {
-            "plan": plan,
+            "plan": plan.to_dict(),
             "research_items": research_items,
             "critiques": critiques,
-            "final_report": final_report,
+            "final_report": final_report.to_dict(),
             "metadata": {
                 "mode": "demo",
                 "speed": self.speed_factor,
-                "total_time": f"{4 + len(plan['subtasks']) * 3 * self.speed_factor:.1f}s"
+                "total_time": f"{total_time:.1f}s"
             }
         }
+    
+    async def _research_and_critique(self, task: Dict[str, Any],
+                                     sem: asyncio.Semaphore) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Research one subtask and critique the result, holding a concurrency slot"""
+        async with sem:
+            research = await self.researcher.research_topic_async(task["task"])
+            critique = await self.critic.acritique_research(research)
+        return (
+            {
+                "task_id": task["id"],
+                "task_description": task["task"],
+                "research": research.to_dict()
+            },
+            {
+                "task_id": task["id"],
+                "critique": critique.to_dict()
+            }
+        )
 
 
 # Quick test
 if __name__ == "__main__":
-    print("🧪 Testing Mock Agents")
-    print("=" * 40)
+    print("🧪 Testing Mock Agents", "=" * 40, sep="\n")
     
     # Test fast mode
     analyst = MockAutoAnalyst(speed="fast")
     
     start_time = time.time()
-    result = analyst.analyze(
+    result = asyncio.run(analyst.analyze_async(
         "Analyze whether AI interview prep tools are a good startup idea in South Asia."
-    )
+    ))
     elapsed = time.time() - start_time
     
-    print(f"\n✅ Mock analysis complete in {elapsed:.1f}s")
-    print(f"   Tasks: {len(result['plan']['subtasks'])}")
-    print(f"   Research items: {len(result['research_items'])}")
-    print(f"   Overall quality: {result['final_report']['executive_summary']['overall_quality_score']}/10") 
+    print(
+        f"\n✅ Mock analysis complete in {elapsed:.1f}s",
+        f"   Tasks: {len(result['plan']['subtasks'])}",
+        f"   Research items: {len(result['research_items'])}",
+        f"   Overall quality: {result['final_report']['executive_summary']['overall_quality_score']}/10",
+        sep="\n"
+    )
@@ -1,117 +1,256 @@
 """
 Mock data system for demo mode
+
+The module passes `mypy --strict` and can be compiled with mypyc
+(`mypyc demo/mock_data.py`) for CI runs that stub out the agent delays.
 """
 
-import json
-import random
+import re
+import functools
+import orjson
+from dataclasses import dataclass, asdict, Field
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Pattern, ClassVar
+
+# Plan category for each problem keyword; one alternation scans for all of them at once
+_PLAN_KEYWORDS: Dict[str, str] = {
+    "startup": "startup",
+    "business idea": "startup",
+    "venture": "startup"
+}
+_PLAN_RE: Pattern[str] = re.compile("|".join(map(re.escape, _PLAN_KEYWORDS)))
+
+# Keyword matcher used to pick research templates (substring matches, like the original any(...) scans)
+_TECH_RE: Pattern[str] = re.compile(r"tech|ai|software")
+
+# Static plan templates; only the problem varies per call
+_STARTUP_PLAN: Dict[str, Any] = {
+    "rationale": "This breakdown covers market validation, competitive analysis, technical feasibility, and financial modeling to thoroughly evaluate the startup potential.",
+    "subtasks": [
+        {
+            "id": 1,
+            "task": "Research market size and growth trends",
+            "agent": "researcher",
+            "tools": ["market_reports", "industry_data"],
+            "expected_output": "Market size estimate and growth projections"
+        },
+        {
+            "id": 2,
+            "task": "Analyze competitor landscape and differentiation",
+            "agent": "analyst",
+            "tools": ["competitor_analysis"],
+            "expected_output": "Competitive analysis matrix and SWOT"
+        },
+        {
+            "id": 3,
+            "task": "Evaluate technical requirements and feasibility",
+            "agent": "technical_expert",
+            "tools": ["tech_assessment"],
+            "expected_output": "Technical feasibility report"
+        }
+    ]
+}
+
+_MARKET_PLAN: Dict[str, Any] = {
+    "rationale": "Comprehensive market analysis covering demand drivers, segmentation, and regional variations.",
+    "subtasks": [
+        {
+            "id": 1,
+            "task": "Analyze demand drivers and customer segments",
+            "agent": "researcher",
+            "tools": ["customer_surveys", "market_data"],
+            "expected_output": "Customer segmentation analysis"
+        },
+        {
+            "id": 2,
+            "task": "Research regional market variations",
+            "agent": "researcher",
+            "tools": ["regional_data", "demographics"],
+            "expected_output": "Regional breakdown report"
+        }
+    ]
+}
+
+# Plan templates by category; problems matching no keyword get the market plan
+_PLANS: Dict[str, Dict[str, Any]] = {
+    "startup": _STARTUP_PLAN,
+    "market": _MARKET_PLAN
+}
+
+# Source templates used by generate_mock_research
+_TECH_TEMPLATES: List[Dict[str, str]] = [
+    {
+        "title": "AI Adoption Growing at 40% CAGR in Target Region",
+        "snippet": "Recent industry reports indicate rapid adoption of AI solutions, with the interview preparation segment showing particularly strong growth.",
+        "url": "https://techreport.example/ai-growth-2024",
+        "credibility": "high"
+    },
+    {
+        "title": "Market Size Estimated at $850M with Strong Growth Projections",
+        "snippet": "The target market is projected to reach $1.2B by 2026, driven by increasing digital literacy and job market competition.",
+        "url": "https://marketresearch.example/size-projections",
+        "credibility": "medium"
+    }
+]
+
+_STARTUP_TEMPLATES: List[Dict[str, str]] = [
+    {
+        "title": "Success Stories: Similar Startups Securing Series A Funding",
+        "snippet": "Three startups in adjacent spaces have raised over $20M in combined funding in the last 12 months.",
+        "url": "https://startuptracker.example/funding-stories",
+        "credibility": "high"
+    },
+    {
+        "title": "Customer Willingness to Pay: Survey Results",
+        "snippet": "68% of surveyed professionals indicated willingness to pay $20-50/month for premium interview preparation tools.",
+        "url": "https://surveydata.example/willingness-pay",
+        "credibility": "medium"
+    }
+]
+
+# Static report skeleton; None placeholders are filled in per report
+_REPORT_SKELETON: Dict[str, Any] = {
+    "metadata": {
+        "problem": None,
+        "generated_at": None,
+        "total_tasks": None,
+        "research_tasks_completed": None,
+        "mode": "demo"
+    },
+    "executive_summary": {
+        "problem_statement": None,
+        "key_insights": [
+            "Strong market growth identified (25% YoY)",
+            "Clear differentiation opportunities available",
+            "Moderate competitive intensity"
+        ],
+        "overall_quality_score": 7,
+        "confidence_level": "medium",
+        "top_recommendation": "Develop MVP and conduct pilot testing with target users"
+    },
+    "recommendations": [
+        "Proceed with MVP development focusing on core AI features",
+        "Secure pilot customers for validation",
+        "Develop detailed go-to-market strategy",
+        "Assemble advisory board with regional expertise"
+    ],
+    "next_steps": [
+        "Week 1-2: Finalize feature set and technical specifications",
+        "Week 3-4: Develop MVP prototype",
+        "Week 5-6: Conduct pilot testing with 20 users",
+        "Week 7-8: Iterate based on feedback"
+    ]
+}
+
+# Gallery of sample problems
+_SAMPLE_PROBLEMS: List[Dict[str, str]] = [
+    {
+        "id": "startup_ai_interview",
+        "title": "AI Interview Prep Startup",
+        "description": "Analyze whether AI interview prep tools are a good startup idea in South Asia",
+        "category": "startup",
+        "difficulty": "medium"
+    },
+    {
+        "id": "market_ev_asia",
+        "title": "EV Market in Southeast Asia",
+        "description": "Analyze the electric vehicle market growth potential in Southeast Asia",
+        "category": "market",
+        "difficulty": "hard"
+    },
+    {
+        "id": "tech_ai_healthcare",
+        "title": "AI in Healthcare Diagnosis",
+        "description": "Evaluate the adoption of AI in healthcare diagnosis in developing countries",
+        "category": "tech",
+        "difficulty": "hard"
+    },
+    {
+        "id": "business_food_delivery",
+        "title": "Food Delivery in Rural Areas",
+        "description": "Analyze the potential for a food delivery app in rural areas with limited infrastructure",
+        "category": "business",
+        "difficulty": "medium"
+    }
+]
+
+class _MockRecord:
+    """Base for the mock records; converted to plain dicts only at the UI/JSON boundary"""
+    
+    __slots__ = ()
+    # Declared so type checkers accept the subclasses' instances as dataclasses
+    __dataclass_fields__: ClassVar[Dict[str, "Field[Any]"]]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the record as a plain dict with the same keys as the real agents' output
+        
+        Memoized records share the module-level template lists, so the nested lists and
+        dicts are copied; callers may mutate the result freely.
+        """
+        return asdict(self)
+
+@dataclass(slots=True, frozen=True)
+class MockPlan(_MockRecord):
+    """Mock task plan"""
+    problem: str
+    rationale: str
+    subtasks: List[Dict[str, Any]]
+
+@dataclass(slots=True, frozen=True)
+class MockResearch(_MockRecord):
+    """Mock research result for one subtask"""
+    topic: str
+    summary: str
+    key_findings: List[Dict[str, Any]]
+    statistics: List[str]
+    sources: List[Dict[str, str]]
+    gaps: List[str]
+    next_steps: List[str]
+
+@dataclass(slots=True)
+class MockCritique(_MockRecord):
+    """Mock critique of a research result"""
+    topic: str
+    validation: Dict[str, Any]
+    critique: Dict[str, Any]
+    improvements: List[Dict[str, str]]
+    overall_quality: int
+    confidence_level: str
+    recommendation: str
+
+@dataclass(slots=True)
+class MockReport(_MockRecord):
+    """Mock final report"""
+    metadata: Dict[str, Any]
+    executive_summary: Dict[str, Any]
+    recommendations: List[str]
+    next_steps: List[str]
 
 class MockDataGenerator:
     """Generate realistic mock data for demonstration"""
     
     @staticmethod
-    def generate_mock_plan(problem: str) -> Dict[str, Any]:
-        """Generate a mock task plan"""
-        plans = {
-            "startup_idea": {
-                "problem": problem,
-                "rationale": "This breakdown covers market validation, competitive analysis, technical feasibility, and financial modeling to thoroughly evaluate the startup potential.",
-                "subtasks": [
-                    {
-                        "id": 1,
-                        "task": "Research market size and growth trends",
-                        "agent": "researcher",
-                        "tools": ["market_reports", "industry_data"],
-                        "expected_output": "Market size estimate and growth projections"
-                    },
-                    {
-                        "id": 2,
-                        "task": "Analyze competitor landscape and differentiation",
-                        "agent": "analyst",
-                        "tools": ["competitor_analysis"],
-                        "expected_output": "Competitive analysis matrix and SWOT"
-                    },
-                    {
-                        "id": 3,
-                        "task": "Evaluate technical requirements and feasibility",
-                        "agent": "technical_expert",
-                        "tools": ["tech_assessment"],
-                        "expected_output": "Technical feasibility report"
-                    }
-                ]
-            },
-            "market_analysis": {
-                "problem": problem,
-                "rationale": "Comprehensive market analysis covering demand drivers, segmentation, and regional variations.",
-                "subtasks": [
-                    {
-                        "id": 1,
-                        "task": "Analyze demand drivers and customer segments",
-                        "agent": "researcher",
-                        "tools": ["customer_surveys", "market_data"],
-                        "expected_output": "Customer segmentation analysis"
-                    },
-                    {
-                        "id": 2,
-                        "task": "Research regional market variations",
-                        "agent": "researcher",
-                        "tools": ["regional_data", "demographics"],
-                        "expected_output": "Regional breakdown report"
-                    }
-                ]
-            }
-        }
-        
-        # Select appropriate plan based on problem keywords
-        problem_lower = problem.lower()
-        if any(word in problem_lower for word in ["startup", "business idea", "venture"]):
-            return plans["startup_idea"]
-        else:
-            return plans["market_analysis"]
+    @functools.lru_cache(maxsize=64)
+    def generate_mock_plan(problem: str) -> MockPlan:
+        """Generate a mock task plan (memoized; plans are frozen and shared between calls)"""
+        # Select appropriate plan based on the first problem keyword found
+        match = _PLAN_RE.search(problem.lower())
+        category = _PLAN_KEYWORDS[match.group()] if match else "market"
+        return MockPlan(problem=problem, **_PLANS[category])
     
     @staticmethod
-    def generate_mock_research(task_description: str) -> Dict[str, Any]:
-        """Generate mock research results"""
-        
-        # Sample data templates
-        tech_templates = [
-            {
-                "title": "AI Adoption Growing at 40% CAGR in Target Region",
-                "snippet": "Recent industry reports indicate rapid adoption of AI solutions, with the interview preparation segment showing particularly strong growth.",
-                "url": "https://techreport.example/ai-growth-2024",
-                "credibility": "high"
-            },
-            {
-                "title": "Market Size Estimated at $850M with Strong Growth Projections",
-                "snippet": "The target market is projected to reach $1.2B by 2026, driven by increasing digital literacy and job market competition.",
-                "url": "https://marketresearch.example/size-projections",
-                "credibility": "medium"
-            }
-        ]
-        
-        startup_templates = [
-            {
-                "title": "Success Stories: Similar Startups Securing Series A Funding",
-                "snippet": "Three startups in adjacent spaces have raised over $20M in combined funding in the last 12 months.",
-                "url": "https://startuptracker.example/funding-stories",
-                "credibility": "high"
-            },
-            {
-                "title": "Customer Willingness to Pay: Survey Results",
-                "snippet": "68% of surveyed professionals indicated willingness to pay $20-50/month for premium interview preparation tools.",
-                "url": "https://surveydata.example/willingness-pay",
-                "credibility": "medium"
-            }
-        ]
+    @functools.lru_cache(maxsize=64)
+    def generate_mock_research(task_description: str) -> MockResearch:
+        """Generate mock research results (memoized; results are frozen and shared between calls)"""
         
         # Select appropriate templates
-        templates = tech_templates if any(word in task_description.lower() for word in ["tech", "ai", "software"]) else startup_templates
+        templates = _TECH_TEMPLATES if _TECH_RE.search(task_description.lower()) is not None else _STARTUP_TEMPLATES
         
-        return {
-            "topic": task_description,
-            "summary": f"Research indicates strong potential for {task_description.split()[0]} with several key opportunities identified.",
-            "key_findings": [
+        return MockResearch(
+            topic=task_description,
+            summary=f"Research indicates strong potential for {task_description.split()[0]} with several key opportunities identified.",
+            key_findings=[
                 {
                     "category": "Market Opportunity",
                     "points": [
@@ -129,43 +268,43 @@ class MockDataGenerator:
                     ]
                 }
             ],
-            "statistics": [
+            statistics=[
                 "Market growth: 25% YoY",
                 "Target audience size: 15M potential users",
                 "Average revenue per user: $180 annually"
             ],
-            "sources": random.sample(templates, min(2, len(templates))),
-            "gaps": [
+            sources=list(templates),
+            gaps=[
                 "Region-specific cultural adaptation data",
                 "Long-term user retention metrics"
             ],
-            "next_steps": [
+            next_steps=[
                 "Conduct user interviews for validation",
                 "Analyze regional regulatory requirements"
             ]
-        }
+        )
     
     @staticmethod
-    def generate_mock_critique(research: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_mock_critique(research: MockResearch) -> MockCritique:
         """Generate mock critique"""
         
         # Determine quality score based on content
-        has_stats = len(research.get("statistics", [])) > 0
-        has_sources = len(research.get("sources", [])) > 0
+        has_stats = bool(research.statistics)
+        has_sources = bool(research.sources)
         
         completeness = 7 if has_stats and has_sources else 5
         accuracy = 8 if has_sources else 6
         
-        return {
-            "topic": research.get("topic", "Unknown"),
-            "validation": {
+        return MockCritique(
+            topic=research.topic,
+            validation={
                 "completeness_score": completeness,
                 "accuracy_score": accuracy,
                 "source_credibility_score": 7,
                 "biases_identified": ["Optimism bias in growth projections"],
                 "assumptions": ["Current trends will continue", "No major regulatory changes"]
             },
-            "critique": {
+            critique={
                 "strengths": [
                     "Comprehensive market data",
                     "Clear opportunity identification",
@@ -178,7 +317,7 @@ class MockDataGenerator:
                 "logical_issues": ["Correlation vs causation in trend analysis"],
                 "missing_perspectives": ["User experience considerations", "Implementation challenges"]
             },
-            "improvements": [
+            improvements=[
                 {
                     "area": "Primary Research",
                     "suggestion": "Conduct 20-30 user interviews for validation",
@@ -190,107 +329,61 @@ class MockDataGenerator:
                     "priority": "medium"
                 }
             ],
-            "overall_quality": (completeness + accuracy) // 2,
-            "confidence_level": "medium",
-            "recommendation": "Proceed with cautious optimism. Validate key assumptions with primary research."
-        }
+            overall_quality=(completeness + accuracy) // 2,
+            confidence_level="medium",
+            recommendation="Proceed with cautious optimism. Validate key assumptions with primary research."
+        )
     
     @staticmethod
-    def generate_mock_report(problem: str, plan: Dict, research_items: List, critiques: List) -> Dict[str, Any]:
+    def generate_mock_report(problem: str, plan: MockPlan, research_items: List[Dict[str, Any]],
+                             critiques: List[Dict[str, Any]]) -> MockReport:
         """Generate complete mock report"""
         
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        return {
-            "metadata": {
+        return MockReport(
+            metadata={
+                **_REPORT_SKELETON["metadata"],
                 "problem": problem,
-                "generated_at": timestamp,
-                "total_tasks": len(plan.get("subtasks", [])),
-                "research_tasks_completed": len(research_items),
-                "mode": "demo"
+                "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "total_tasks": len(plan.subtasks),
+                "research_tasks_completed": len(research_items)
             },
-            "executive_summary": {
-                "problem_statement": problem,
-                "key_insights": [
-                    "Strong market growth identified (25% YoY)",
-                    "Clear differentiation opportunities available",
-                    "Moderate competitive intensity"
-                ],
-                "overall_quality_score": 7,
-                "confidence_level": "medium",
-                "top_recommendation": "Develop MVP and conduct pilot testing with target users"
-            },
-            "recommendations": [
-                "Proceed with MVP development focusing on core AI features",
-                "Secure pilot customers for validation",
-                "Develop detailed go-to-market strategy",
-                "Assemble advisory board with regional expertise"
-            ],
-            "next_steps": [
-                "Week 1-2: Finalize feature set and technical specifications",
-                "Week 3-4: Develop MVP prototype",
-                "Week 5-6: Conduct pilot testing with 20 users",
-                "Week 7-8: Iterate based on feedback"
-            ]
-        }
+            executive_summary={**_REPORT_SKELETON["executive_summary"], "problem_statement": problem},
+            recommendations=_REPORT_SKELETON["recommendations"],
+            next_steps=_REPORT_SKELETON["next_steps"]
+        )
     
     @staticmethod
     def get_sample_problems() -> List[Dict[str, str]]:
         """Get sample problems for the gallery"""
-        return [
-            {
-                "id": "startup_ai_interview",
-                "title": "AI Interview Prep Startup",
-                "description": "Analyze whether AI interview prep tools are a good startup idea in South Asia",
-                "category": "startup",
-                "difficulty": "medium"
-            },
-            {
-                "id": "market_ev_asia",
-                "title": "EV Market in Southeast Asia",
-                "description": "Analyze the electric vehicle market growth potential in Southeast Asia",
-                "category": "market",
-                "difficulty": "hard"
-            },
-            {
-                "id": "tech_ai_healthcare",
-                "title": "AI in Healthcare Diagnosis",
-                "description": "Evaluate the adoption of AI in healthcare diagnosis in developing countries",
-                "category": "tech",
-                "difficulty": "hard"
-            },
-            {
-                "id": "business_food_delivery",
-                "title": "Food Delivery in Rural Areas",
-                "description": "Analyze the potential for a food delivery app in rural areas with limited infrastructure",
-                "category": "business",
-                "difficulty": "medium"
-            }
-        ]
+        return _SAMPLE_PROBLEMS
+    
+    @staticmethod
+    def to_json(data: Any, indent: bool = False) -> bytes:
+        """Serialize mock records or result dicts with orjson (dataclasses are handled natively)"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
 
 
 # Quick test
 if __name__ == "__main__":
-    generator = MockDataGenerator()
-    
-    print("🧪 Testing Mock Data Generator")
-    print("=" * 40)
+    # Collect the report and print it in one write
+    lines = ["🧪 Testing Mock Data Generator", "=" * 40]
     
     # Test plan generation
     problem = "Test startup idea"
-    plan = generator.generate_mock_plan(problem)
-    print(f"✅ Plan generated: {len(plan['subtasks'])} tasks")
+    plan = MockDataGenerator.generate_mock_plan(problem)
+    lines.append(f"✅ Plan generated: {len(plan.subtasks)} tasks")
     
     # Test research generation
-    research = generator.generate_mock_research("Market research")
-    print(f"✅ Research generated: {len(research['key_findings'])} findings")
+    research = MockDataGenerator.generate_mock_research("Market research")
+    lines.append(f"✅ Research generated: {len(research.key_findings)} findings")
     
     # Test critique generation
-    critique = generator.generate_mock_critique(research)
-    print(f"✅ Critique generated: Score {critique['overall_quality']}/10")
+    critique = MockDataGenerator.generate_mock_critique(research)
+    lines.append(f"✅ Critique generated: Score {critique.overall_quality}/10")
     
     # Test sample problems
-    samples = generator.get_sample_problems()
-    print(f"✅ {len(samples)} sample problems available")
+    samples = MockDataGenerator.get_sample_problems()
+    lines.append(f"✅ {len(samples)} sample problems available")
     
-    print("\n🎯 Mock data system ready for UI development!")
\ No newline at end of file
+    lines.append("\n🎯 Mock data system ready for UI development!")
+    print(*lines, sep="\n")
\ No newline at end of file
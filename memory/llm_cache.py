@@ -0,0 +1,60 @@
+import json
+import hashlib
+from typing import Optional, Any, Dict
+
+
+class DiskCacheBackend:
+    """Persistent cache backend stored on disk with diskcache"""
+    
+    def __init__(self, directory: str = "outputs/.llm_cache", ttl: Optional[int] = 86400):
+        """
+        Initialize the disk cache
+        
+        Args:
+            directory: Folder holding the cache database
+            ttl: Expiry for cached entries in seconds (None keeps them forever)
+        """
+        import diskcache
+        self.cache = diskcache.Cache(directory)
+        self.ttl = ttl
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None on a miss"""
+        return self.cache.get(key)
+    
+    def set(self, key: str, value: Any):
+        """Store a value under a key"""
+        self.cache.set(key, value, expire=self.ttl)
+
+
+class LLMCache:
+    """Cache of LLM responses keyed by a hash of the model, prompt and temperature"""
+    
+    def __init__(self, backend: Any):
+        """
+        Initialize the LLM cache
+        
+        Args:
+            backend: Object providing get(key) and set(key, value)
+        """
+        self.backend = backend
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+    
+    @staticmethod
+    def cache_key(model: str, prompt: str, temperature: float) -> str:
+        """Build a stable cache key for an LLM request"""
+        payload = json.dumps({"model": model, "prompt": prompt, "temperature": temperature}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, counting hits and misses"""
+        value = self.backend.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+    
+    def set(self, key: str, response: str):
+        """Store a response for a key"""
+        self.backend.set(key, response)
@@ -1,9 +1,12 @@
 import streamlit as st
-import json
+import orjson
 import time
-import os
+import uuid
+import threading
+import importlib.util
 from datetime import datetime
 from pathlib import Path
+from typing import Optional, Dict, Tuple
 
 
 # Load .env for local development
@@ -20,61 +23,147 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1E88E5;
-        margin-bottom: 1rem;
-    }
-    .agent-card {
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border-left: 4px solid #1E88E5;
-        background-color: #f8f9fa;
-    }
-    .success-card {
-        border-left-color: #4CAF50;
-        background-color: #f1f8e9;
-    }
-    .warning-card {
-        border-left-color: #FF9800;
-        background-color: #fff3e0;
-    }
-    .metric-card {
-        text-align: center;
-        padding: 1rem;
-        border-radius: 10px;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Import mock system
-try:
-    from demo.mock_agents import MockAutoAnalyst
-    from demo.mock_data import MockDataGenerator
-    MOCK_AVAILABLE = True
-except ImportError:
-    MOCK_AVAILABLE = False
-
-# Import real system
-try:
+# Custom CSS for the header and agent cards; theme colours live in .streamlit/config.toml.
+# Streamlit drops elements a rerun does not redraw, so this must be emitted on every run.
+st.markdown(
+    "<style>"
+    ".main-header{font-size:2.5rem;color:#1E88E5;margin-bottom:1rem}"
+    ".agent-card{border-radius:10px;padding:1rem;margin:0.5rem 0;border-left:4px solid #1E88E5;background-color:#f8f9fa}"
+    ".success-card{border-left-color:#4CAF50;background-color:#f1f8e9}"
+    "</style>",
+    unsafe_allow_html=True
+)
+
+# Packages the real system needs at import time; their presence is checked without importing them
+REAL_SYSTEM_PACKAGES = ("langchain_core", "langchain_groq", "tenacity")
+
+@st.cache_resource
+def real_available() -> bool:
+    """Whether the real system is installed; app and the LangChain stack are only imported once a real analysis runs"""
+    return all(importlib.util.find_spec(name) is not None for name in REAL_SYSTEM_PACKAGES)
+
+@st.cache_resource
+def mock_system():
+    """The (MockAutoAnalyst, MockDataGenerator) classes, or None when the mock system cannot be imported"""
+    try:
+        from demo.mock_agents import MockAutoAnalyst
+        from demo.mock_data import MockDataGenerator
+    except ImportError:
+        return None
+    return MockAutoAnalyst, MockDataGenerator
+
+@st.cache_resource
+def get_real_analyst():
+    """Build the real analyst once per server process; its agents and clients are reused across reruns"""
     from app import AutoAnalyst
-    REAL_AVAILABLE = True
-except ImportError:
-    REAL_AVAILABLE = False
+    return AutoAnalyst()
+
+@st.cache_resource
+def get_mock_analyst(speed: str):
+    """Build one mock analyst per simulation speed"""
+    mock_analyst, _ = mock_system()
+    return mock_analyst(speed=speed)
+
+class ReportCache:
+    """Recent real-analysis reports keyed by problem, shared by every session of the server process"""
+    
+    def __init__(self, max_entries: int = 32, ttl: float = 24 * 60 * 60):
+        """
+        Initialize the report cache
+        
+        Args:
+            max_entries: Reports kept before the oldest is evicted
+            ttl: Seconds a report stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._reports: Dict[str, Tuple[float, dict]] = {}
+        # Sessions run on separate script threads
+        self._lock = threading.Lock()
+    
+    def get(self, problem: str) -> Optional[dict]:
+        """Return the stored report for a problem, or None when missing or expired"""
+        with self._lock:
+            entry = self._reports.get(problem)
+            if entry is None:
+                return None
+            stored_at, report = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._reports[problem]
+                return None
+            return report
+    
+    def put(self, problem: str, report: dict):
+        """Store a report, evicting the oldest entries beyond max_entries"""
+        with self._lock:
+            self._reports.pop(problem, None)
+            self._reports[problem] = (time.monotonic(), report)
+            while len(self._reports) > self.max_entries:
+                del self._reports[next(iter(self._reports))]
+
+@st.cache_resource
+def report_cache() -> ReportCache:
+    """The process-wide ReportCache; demo runs are cheap and are never stored"""
+    return ReportCache()
+
+@st.cache_data
+def sample_problems():
+    """Sample gallery entries, built once and handed out as copies on each rerun"""
+    _, generator = mock_system()
+    return generator.get_sample_problems()
 
+# Session history keeps at most this many entries; their reports are stored under HISTORY_DIR
+MAX_HISTORY = 20
+HISTORY_DIR = Path("outputs/.history")
+HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+# Sessions that end never delete their files, so the directory is pruned by age and by count across all sessions
+HISTORY_TTL = 24 * 60 * 60
+MAX_HISTORY_FILES = 200
 
+def prune_history():
+    """Delete history reports older than HISTORY_TTL, then the oldest beyond MAX_HISTORY_FILES"""
+    files = []
+    for path in HISTORY_DIR.glob("*.json"):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    files.sort(reverse=True)
+    cutoff = time.time() - HISTORY_TTL
+    for i, (mtime, path) in enumerate(files):
+        if i >= MAX_HISTORY_FILES or mtime < cutoff:
+            path.unlink(missing_ok=True)
+
+@st.cache_resource
+def prune_history_on_startup():
+    """Clear out reports left behind by a previous server process"""
+    prune_history()
+
+prune_history_on_startup()
         
 # Initialize session state
-if 'analysis_history' not in st.session_state:
-    st.session_state.analysis_history = []
-if 'current_analysis' not in st.session_state:
-    st.session_state.current_analysis = None
+for key, default in (
+    ("analysis_history", []),
+    ("analyses_run", 0),
+    ("current_analysis", None),
+    ("problem_input", "Analyze whether AI interview prep tools are a good startup idea in South Asia.")
+):
+    st.session_state.setdefault(key, default)
+
+# Button callbacks update state before Streamlit's own rerun, so no extra st.rerun() is needed
+def set_problem(text: str):
+    """Fill the problem input"""
+    st.session_state.problem_input = text
+
+def load_report(report_path: str):
+    """Show a report from the history, reading it back from disk; entries whose file is gone are dropped"""
+    try:
+        st.session_state.current_analysis = orjson.loads(Path(report_path).read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        st.session_state.analysis_history = [
+            entry for entry in st.session_state.analysis_history if entry["report_path"] != report_path
+        ]
+        st.warning("This report is no longer available on disk and was removed from the history.")
 
 # Sidebar
 with st.sidebar:
@@ -84,23 +173,23 @@ with st.sidebar:
     # Mode selection
     st.subheader("Operation Mode")
     
-    if not REAL_AVAILABLE and not MOCK_AVAILABLE:
-        st.error("No analysis systems available. Please check imports.")
-        mode = "demo"
-    elif not REAL_AVAILABLE:
+    mode = st.radio(
+        "Select Mode:",
+        ["Real Analysis", "Demo Mode"],
+        help="Real: Uses actual web search and LLM. Demo: Uses mock data for fast testing."
+    )
+    
+    if mode == "Real Analysis" and not real_available():
         st.warning("Real agent not available. Using demo mode only.")
-        mode = "demo"
-    else:
-        mode = st.radio(
-            "Select Mode:",
-            ["Real Analysis", "Demo Mode"],
-            help="Real: Uses actual web search and LLM. Demo: Uses mock data for fast testing."
-        )
+        mode = "Demo Mode"
+    system_available = mode == "Real Analysis" or mock_system() is not None
+    if not system_available:
+        st.error("No analysis systems available. Please check imports.")
     
     st.divider()
     
     # Demo settings
-    if mode == "Demo Mode" and MOCK_AVAILABLE:
+    if mode == "Demo Mode" and system_available:
         st.subheader("Demo Settings")
         
         speed = st.select_slider(
@@ -115,13 +204,9 @@ with st.sidebar:
         
         # Sample gallery
         st.subheader("Sample Gallery")
-        generator = MockDataGenerator()
-        samples = generator.get_sample_problems()
-        
-        for sample in samples:
-            if st.button(f"📋 {sample['title']}", key=f"sample_{sample['id']}"):
-                st.session_state.problem_input = sample['description']
-                st.rerun()
+        for sample in sample_problems():
+            st.button(f"📋 {sample['title']}", key=f"sample_{sample['id']}",
+                      on_click=set_problem, args=(sample['description'],))
     
     st.divider()
     
@@ -141,7 +226,7 @@ col1, col2 = st.columns([3, 1])
 with col1:
     st.markdown('<h1 class="main-header">🤖 AI Research & Decision-Making Agent</h1>', unsafe_allow_html=True)
 with col2:
-    st.metric("Analyses Run", len(st.session_state.analysis_history))
+    st.metric("Analyses Run", st.session_state.analyses_run)
 
 st.markdown("""
 **Transform vague problems into research-backed insights** with sources, reasoning, and actionable recommendations.
@@ -150,10 +235,6 @@ st.markdown("""
 # Problem input
 st.subheader("📝 Enter Your Problem or Query")
 
-# Initialize problem input in session state
-if 'problem_input' not in st.session_state:
-    st.session_state.problem_input = "Analyze whether AI interview prep tools are a good startup idea in South Asia."
-
 problem = st.text_area(
     " ",
     value=st.session_state.problem_input,
@@ -166,21 +247,17 @@ problem = st.text_area(
 st.write("**Try these examples:**")
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    if st.button("🚀 Startup Idea", use_container_width=True):
-        st.session_state.problem_input = "Analyze whether AI interview prep tools are a good startup idea in South Asia."
-        st.rerun()
+    st.button("🚀 Startup Idea", use_container_width=True, on_click=set_problem,
+              args=("Analyze whether AI interview prep tools are a good startup idea in South Asia.",))
 with col2:
-    if st.button("📈 Market Analysis", use_container_width=True):
-        st.session_state.problem_input = "Analyze the electric vehicle market growth potential in Southeast Asia."
-        st.rerun()
+    st.button("📈 Market Analysis", use_container_width=True, on_click=set_problem,
+              args=("Analyze the electric vehicle market growth potential in Southeast Asia.",))
 with col3:
-    if st.button("🏥 Healthcare Tech", use_container_width=True):
-        st.session_state.problem_input = "Evaluate the adoption of AI in healthcare diagnosis in developing countries."
-        st.rerun()
+    st.button("🏥 Healthcare Tech", use_container_width=True, on_click=set_problem,
+              args=("Evaluate the adoption of AI in healthcare diagnosis in developing countries.",))
 with col4:
-    if st.button("🍔 Food Delivery", use_container_width=True):
-        st.session_state.problem_input = "Analyze the potential for a food delivery app in rural areas with limited infrastructure."
-        st.rerun()
+    st.button("🍔 Food Delivery", use_container_width=True, on_click=set_problem,
+              args=("Analyze the potential for a food delivery app in rural areas with limited infrastructure.",))
 
 # Analysis button
 st.divider()
@@ -190,13 +267,52 @@ with col2:
         "🚀 START ANALYSIS",
         type="primary",
         use_container_width=True,
-        disabled=(not REAL_AVAILABLE and not MOCK_AVAILABLE)
+        disabled=not system_available
     )
 
 # Agent visualization placeholder
 agent_placeholder = st.empty()
 results_placeholder = st.empty()
 
+# Agent cards shown during an analysis: (stage, title, text once done, status shown next)
+AGENT_STAGES = (
+    ("planner", "📋 Task Planner", "✅ Planning complete", "🔍 Researching web..."),
+    ("researcher", "🔍 Researcher", "✅ Research complete", "🎯 Critical analysis..."),
+    ("critic", "🎯 Critic", "✅ Validation complete", "📄 Generating final report..."),
+    ("reporter", "📄 Reporter", "✅ Report ready", "💾 Saving results...")
+)
+
+def render_agent_card(slot, title: str, text: str, done: bool = False):
+    """Render one agent card into its placeholder with a single markdown call"""
+    css = "agent-card success-card" if done else "agent-card"
+    slot.markdown(f'<div class="{css}"><strong>{title}</strong><br>{text}</div>', unsafe_allow_html=True)
+
+def throttled(callback, interval: float = 0.05):
+    """
+    Wrap a UI update so it runs at most once per interval
+    
+    Calls that arrive too soon are dropped, except the most recent one, which
+    wrapped.flush() applies so the final state is never lost.
+    """
+    last = [0.0]
+    pending = []
+    
+    def wrapped(*args):
+        now = time.monotonic()
+        if now - last[0] >= interval:
+            last[0] = now
+            pending.clear()
+            callback(*args)
+        else:
+            pending[:] = [args]
+    
+    def flush():
+        if pending:
+            callback(*pending.pop())
+    
+    wrapped.flush = flush
+    return wrapped
+
 # Analysis execution
 if analyze_button and problem:
     with agent_placeholder.container():
@@ -204,246 +320,198 @@ if analyze_button and problem:
         
         # Create progress tracker
         progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # Agent visualization
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            agent1 = st.container()
-            agent1.markdown('<div class="agent-card">', unsafe_allow_html=True)
-            agent1.markdown("**📋 Task Planner**")
-            agent1.markdown("Breaking down problem...")
-            agent1.markdown('</div>', unsafe_allow_html=True)
-        
-        with col2:
-            agent2 = st.container()
-            agent2.markdown('<div class="agent-card">', unsafe_allow_html=True)
-            agent2.markdown("**🔍 Researcher**")
-            agent2.markdown("Waiting...")
-            agent2.markdown('</div>', unsafe_allow_html=True)
-        
-        with col3:
-            agent3 = st.container()
-            agent3.markdown('<div class="agent-card">', unsafe_allow_html=True)
-            agent3.markdown("**🎯 Critic**")
-            agent3.markdown("Waiting...")
-            agent3.markdown('</div>', unsafe_allow_html=True)
         
-        with col4:
-            agent4 = st.container()
-            agent4.markdown('<div class="agent-card">', unsafe_allow_html=True)
-            agent4.markdown("**📄 Reporter**")
-            agent4.markdown("Waiting...")
-            agent4.markdown('</div>', unsafe_allow_html=True)
+        # Agent visualization, one card per pipeline stage
+        card_slots = {}
+        for column, (stage, title, _, _) in zip(st.columns(len(AGENT_STAGES)), AGENT_STAGES):
+            card_slots[stage] = column.empty()
+            render_agent_card(card_slots[stage], title, "Breaking down problem..." if stage == "planner" else "Waiting...")
+        stage_info = {stage: (title, done_text, next_status) for stage, title, done_text, next_status in AGENT_STAGES}
         
-        # Run analysis based on mode
+        # Run analysis based on mode; progress is driven by events from the agents themselves
         try:
-            if mode == "Real Analysis" and REAL_AVAILABLE:
-                # Real analysis
-                status_text.text("Initializing real agents...")
-                progress_bar.progress(10)
-                time.sleep(1)
-                
-                analyst = AutoAnalyst()
-                
-                status_text.text("📋 Planning tasks...")
-                progress_bar.progress(30)
-                agent1.markdown('<div class="agent-card success-card">', unsafe_allow_html=True)
-                agent1.markdown("**📋 Task Planner**")
-                agent1.markdown("✅ Planning complete")
-                agent1.markdown('</div>', unsafe_allow_html=True)
-                time.sleep(1)
-                
-                status_text.text("🔍 Researching web...")
-                progress_bar.progress(50)
-                agent2.markdown('<div class="agent-card success-card">', unsafe_allow_html=True)
-                agent2.markdown("**🔍 Researcher**")
-                agent2.markdown("✅ Researching...")
-                agent2.markdown('</div>', unsafe_allow_html=True)
-                time.sleep(2)
-                
-                status_text.text("🎯 Critical analysis...")
-                progress_bar.progress(70)
-                agent3.markdown('<div class="agent-card success-card">', unsafe_allow_html=True)
-                agent3.markdown("**🎯 Critic**")
-                agent3.markdown("✅ Validating...")
-                agent3.markdown('</div>', unsafe_allow_html=True)
-                time.sleep(1)
-                
-                status_text.text("📄 Generating final report...")
-                progress_bar.progress(90)
-                agent4.markdown('<div class="agent-card success-card">', unsafe_allow_html=True)
-                agent4.markdown("**📄 Reporter**")
-                agent4.markdown("✅ Compiling...")
-                agent4.markdown('</div>', unsafe_allow_html=True)
-                
-                # Run actual analysis
-                report = analyst.analyze(problem)
-                
-                status_text.text("✅ Analysis complete!")
+            use_real = mode == "Real Analysis"
+            # MockAutoAnalyst paces itself according to the selected speed
+            speed = None if use_real else (demo_speed if 'demo_speed' in locals() else "normal")
+            
+            # Identical real requests reuse the stored report instead of rerunning the pipeline
+            report = report_cache().get(problem) if use_real else None
+            if report is not None:
+                for stage, title, done_text, _ in AGENT_STAGES:
+                    render_agent_card(card_slots[stage], title, done_text, done=True)
                 progress_bar.progress(100)
-                
+                st.info("♻️ Loaded a cached report for this problem.")
             else:
-                # Demo mode
-                status_text.text("Starting demo analysis...")
-                progress_bar.progress(20)
-                time.sleep(0.5)
-                
-                analyst = MockAutoAnalyst(speed=demo_speed if 'demo_speed' in locals() else "normal")
+                analyst = get_real_analyst() if use_real else get_mock_analyst(speed)
                 
-                status_text.text("📋 Planning tasks...")
-                progress_bar.progress(40)
-                agent1.markdown('<div class="agent-card success-card">', unsafe_allow_html=True)
-                agent1.markdown("**📋 Task Planner**")
-                agent1.markdown("✅ Mock planning complete")
-                agent1.markdown('</div>', unsafe_allow_html=True)
-                time.sleep(1 * (0.5 if demo_speed == "fast" else 1.0))
+                with st.status("📋 Planning tasks...", expanded=True) as status:
+                    finished, rendered = [], set()
+                    
+                    def update_ui(pct):
+                        """Draw every stage finished since the last redraw"""
+                        for stage in finished:
+                            if stage not in rendered:
+                                title, done_text, _ = stage_info[stage]
+                                render_agent_card(card_slots[stage], title, done_text, done=True)
+                                status.write(f"{title}: {done_text}")
+                                rendered.add(stage)
+                        status.update(label=stage_info[finished[-1]][2])
+                        progress_bar.progress(pct)
+                    
+                    # Cap redraws at 20 per second; stage events can arrive back to back
+                    refresh = throttled(update_ui)
+                    for stage, payload in analyst.analyze_stream(problem):
+                        if stage == "done":
+                            break
+                        finished.append(stage)
+                        refresh(payload)
+                    refresh.flush()
+                    status.update(label="✅ Analysis complete!" if use_real else "✅ Demo analysis complete!",
+                                  state="complete", expanded=False)
                 
-                status_text.text("🔍 Simulating research...")
-                progress_bar.progress(60)
-                agent2.markdown('<div class="agent-card success-card">', unsafe_allow_html=True)
-                agent2.markdown("**🔍 Researcher**")
-                agent2.markdown("✅ Mock data generated")
-                agent2.markdown('</div>', unsafe_allow_html=True)
-                time.sleep(1.5 * (0.5 if demo_speed == "fast" else 1.0))
-                
-                status_text.text("🎯 Critical analysis...")
-                progress_bar.progress(80)
-                agent3.markdown('<div class="agent-card success-card">', unsafe_allow_html=True)
-                agent3.markdown("**🎯 Critic**")
-                agent3.markdown("✅ Mock critique done")
-                agent3.markdown('</div>', unsafe_allow_html=True)
-                time.sleep(1 * (0.5 if demo_speed == "fast" else 1.0))
-                
-                status_text.text("📄 Generating report...")
-                progress_bar.progress(95)
-                agent4.markdown('<div class="agent-card success-card">', unsafe_allow_html=True)
-                agent4.markdown("**📄 Reporter**")
-                agent4.markdown("✅ Report ready")
-                agent4.markdown('</div>', unsafe_allow_html=True)
-                time.sleep(0.5)
-                
-                # Run mock analysis
-                result = analyst.analyze(problem)
-                report = result['final_report']
-                
-                status_text.text("✅ Demo analysis complete!")
-                progress_bar.progress(100)
+                # The mock analyst returns the report together with its intermediate results
+                report = payload if use_real else payload["final_report"]
+                if use_real:
+                    report_cache().put(problem, report)
             
-            # Store in history
+            # Store in history; the report itself lives on disk and is only read back on "Load"
+            report_path = HISTORY_DIR / f"{uuid.uuid4().hex}.json"
+            report_path.write_bytes(orjson.dumps(report))
             analysis_entry = {
                 "timestamp": datetime.now().isoformat(),
                 "problem": problem[:100] + "..." if len(problem) > 100 else problem,
                 "mode": mode,
-                "report": report
+                "report_path": str(report_path)
             }
-            st.session_state.analysis_history.insert(0, analysis_entry)
+            history = st.session_state.analysis_history
+            history.insert(0, analysis_entry)
+            for dropped in history[MAX_HISTORY:]:
+                Path(dropped["report_path"]).unlink(missing_ok=True)
+            del history[MAX_HISTORY:]
+            prune_history()
+            st.session_state.analyses_run += 1
             st.session_state.current_analysis = report
             
             # Show success
-            time.sleep(0.5)
             st.success(f"Analysis complete! Generated report with {len(report.get('recommendations', []))} recommendations.")
             
         except Exception as e:
             st.error(f"Analysis failed: {str(e)}")
             st.info("Try switching to Demo Mode or check your API configuration.")
 
+# Export payloads are built once per report instead of on every rerun
+@st.cache_data(show_spinner=False, max_entries=16)
+def report_json(report: dict) -> bytes:
+    """Pretty-printed JSON export of a report"""
+    return orjson.dumps(report, option=orjson.OPT_INDENT_2)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def report_text(report: dict, mode: str) -> str:
+    """Plain-text summary export of a report"""
+    exec_summary = report.get('executive_summary', {})
+    parts = [
+        "AUTO-ANALYST REPORT",
+        "=" * 50,
+        f"Problem: {exec_summary.get('problem_statement', '')}",
+        # Taken from the report rather than the clock, so a cached export never shows a stale time
+        f"Generated: {report.get('metadata', {}).get('generated_at') or 'Unknown time'}",
+        f"Mode: {mode}",
+        "",
+        "EXECUTIVE SUMMARY:",
+        "=" * 30,
+        f"Overall Quality: {exec_summary.get('overall_quality_score', 'N/A')}/10",
+        f"Confidence: {str(exec_summary.get('confidence_level', 'N/A')).upper()}",
+        "",
+        "KEY INSIGHTS:"
+    ]
+    parts.extend(f"• {insight}" for insight in exec_summary.get('key_insights', []))
+    parts += ["", "RECOMMENDATIONS:", "=" * 30]
+    parts.extend(f"{i}. {rec}" for i, rec in enumerate(report.get('recommendations', []), 1))
+    return "\n".join(parts) + "\n"
+
 # Display results if available
-if st.session_state.current_analysis:
-    with results_placeholder.container():
-        st.divider()
-        st.subheader("📊 Analysis Results")
+@st.fragment
+def results_panel(mode: str, export_format: str):
+    """Render the current analysis; interactions inside the panel rerun only this fragment"""
+    report = st.session_state.current_analysis
+    if not report:
+        return
+    
+    st.divider()
+    st.subheader("📊 Analysis Results")
+    
+    exec_summary = report.get('executive_summary', {})
+    quality = exec_summary.get('overall_quality_score', 'N/A')
+    confidence = str(exec_summary.get('confidence_level', 'N/A')).upper()
+    insights = exec_summary.get('key_insights', [])
+    recs = report.get('recommendations', [])
+    steps = report.get('next_steps', [])
+    
+    # Metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        quality_score = quality
+        if quality_score in (None, 0, 'N/A'):
+            # Try to get from a different location
+            if 'critical_assessment' in report:
+                quality_score = report['critical_assessment'].get('overall_score', 'N/A')
+            else:
+                quality_score = 'N/A'
+        st.metric("Quality Score", f"{quality_score}/10")
+
+    with col2:
+        st.metric("Confidence", confidence)
+    with col3:
+        st.metric("Recommendations", len(recs))
+    
+    # Tabs for different sections
+    tab1, tab2, tab3, tab4 = st.tabs(["📋 Executive Summary", "🎯 Recommendations", "🚀 Next Steps", "📁 Export"])
+    
+    with tab1:
+        st.write("**Problem Statement:**")
+        st.info(exec_summary.get('problem_statement', 'No problem statement'))
         
-        report = st.session_state.current_analysis
-        exec_summary = report.get('executive_summary', {})
+        st.write("**Key Insights:**")
+        st.markdown("\n\n".join(f"• {insight}" for insight in insights))
         
-                # Metrics
-        col1, col2, col3 = st.columns(3)
+        st.write("**Overall Assessment:**")
+        col1, col2 = st.columns(2)
         with col1:
-            quality_score = exec_summary.get('overall_quality_score')
-            if quality_score is None or quality_score == 0:
-                # Try to get from a different location
-                if 'critical_assessment' in report:
-                    quality_score = report['critical_assessment'].get('overall_score', 'N/A')
-                else:
-                    quality_score = 'N/A'
-            st.metric("Quality Score", f"{quality_score}/10")
-
+            st.write(f"**Quality:** {quality}/10")
         with col2:
-            st.metric("Confidence", exec_summary.get('confidence_level', 'N/A').upper())
-        with col3:
-            st.metric("Recommendations", len(report.get('recommendations', [])))
-        
-        # Tabs for different sections
-        tab1, tab2, tab3, tab4 = st.tabs(["📋 Executive Summary", "🎯 Recommendations", "🚀 Next Steps", "📁 Export"])
-        
-        with tab1:
-            st.write("**Problem Statement:**")
-            st.info(exec_summary.get('problem_statement', 'No problem statement'))
-            
-            st.write("**Key Insights:**")
-            for insight in exec_summary.get('key_insights', []):
-                st.markdown(f"• {insight}")
-            
-            st.write("**Overall Assessment:**")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write(f"**Quality:** {exec_summary.get('overall_quality_score', 'N/A')}/10")
-            with col2:
-                st.write(f"**Confidence:** {exec_summary.get('confidence_level', 'N/A').upper()}")
+            st.write(f"**Confidence:** {confidence}")
+    
+    with tab2:
+        st.write("**Actionable Recommendations:**")
+        st.markdown("\n".join(f"{i}. **{rec}**" for i, rec in enumerate(recs, 1)))
+    
+    with tab3:
+        st.write("**Suggested Next Steps:**")
+        st.markdown("\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1)))
+    
+    with tab4:
+        st.write("**Export Options**")
         
-        with tab2:
-            st.write("**Actionable Recommendations:**")
-            for i, rec in enumerate(report.get('recommendations', []), 1):
-                st.markdown(f"{i}. **{rec}**")
+        if export_format in ["JSON", "Both"]:
+            st.download_button(
+                label="📥 Download JSON",
+                data=report_json(report),
+                file_name=f"auto_analyst_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json"
+            )
         
-        with tab3:
-            st.write("**Suggested Next Steps:**")
-            for i, step in enumerate(report.get('next_steps', []), 1):
-                st.markdown(f"{i}. {step}")
+        if export_format in ["Text Summary", "Both"]:
+            st.download_button(
+                label="📄 Download Text Summary",
+                data=report_text(report, mode),
+                file_name=f"auto_analyst_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                mime="text/plain"
+            )
         
-        with tab4:
-            st.write("**Export Options**")
-            
-            if export_format in ["JSON", "Both"]:
-                json_str = json.dumps(report, indent=2)
-                st.download_button(
-                    label="📥 Download JSON",
-                    data=json_str,
-                    file_name=f"auto_analyst_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json"
-                )
-            
-            if export_format in ["Text Summary", "Both"]:
-                # Create text summary
-                text_summary = f"""AUTO-ANALYST REPORT
-{'='*50}
-Problem: {exec_summary.get('problem_statement', '')}
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Mode: {mode}
-
-EXECUTIVE SUMMARY:
-{'='*30}
-Overall Quality: {exec_summary.get('overall_quality_score', 'N/A')}/10
-Confidence: {exec_summary.get('confidence_level', 'N/A').upper()}
-
-KEY INSIGHTS:
-"""
-                for insight in exec_summary.get('key_insights', []):
-                    text_summary += f"• {insight}\n"
-                
-                text_summary += f"\nRECOMMENDATIONS:\n{'='*30}\n"
-                for i, rec in enumerate(report.get('recommendations', []), 1):
-                    text_summary += f"{i}. {rec}\n"
-                
-                st.download_button(
-                    label="📄 Download Text Summary",
-                    data=text_summary,
-                    file_name=f"auto_analyst_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                    mime="text/plain"
-                )
-            
-            st.info("Reports are also automatically saved to the 'outputs/' folder.")
+        st.info("Reports are also automatically saved to the 'outputs/' folder.")
+
+with results_placeholder.container():
+    results_panel(mode, export_format)
 
 # History panel
 if st.session_state.analysis_history:
@@ -454,9 +522,7 @@ if st.session_state.analysis_history:
         for i, entry in enumerate(st.session_state.analysis_history[:5]):
             with st.expander(f"{entry['timestamp'][11:16]} - {entry['problem']}"):
                 st.caption(f"Mode: {entry['mode']}")
-                if st.button("Load", key=f"load_{i}"):
-                    st.session_state.current_analysis = entry['report']
-                    st.rerun()
+                st.button("Load", key=f"load_{i}", on_click=load_report, args=(entry['report_path'],))
 
 # Footer
 st.divider()
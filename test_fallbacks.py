@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+# The agents need the Groq SDK and LangChain; skip rather than fail where they are not installed
+groq = pytest.importorskip("groq")
+
+import httpx
+from agents import base_llm
+from agents.critic import CriticAgent
+from agents.planner import TaskPlanner
+
+RESEARCH = {"topic": "AI interview prep tools", "summary": "Sample research"}
+
+
+class FailingChain:
+    """Stand-in for a LangChain runnable whose every call is rejected by the Groq API"""
+    
+    def __init__(self, error: Exception):
+        self.error = error
+    
+    def invoke(self, inputs):
+        raise self.error
+    
+    async def ainvoke(self, inputs):
+        raise self.error
+    
+    def stream(self, inputs):
+        raise self.error
+
+
+def groq_error(error_cls, status: int) -> Exception:
+    """Build a Groq API error as the SDK raises it for an HTTP status"""
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    return error_cls("rejected", response=httpx.Response(status, request=request), body=None)
+
+
+@pytest.fixture(autouse=True)
+def groq_key(monkeypatch):
+    """Agents need a key to be constructed; no request ever reaches the network"""
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    base_llm._resolve_config.cache_clear()
+    base_llm.get_llm.cache_clear()
+    yield
+    base_llm._resolve_config.cache_clear()
+    base_llm.get_llm.cache_clear()
+
+
+@pytest.fixture(params=[(400, "BadRequestError"), (401, "AuthenticationError")], ids=["400", "401"])
+def rejected(request):
+    """A FailingChain raising a non-transient Groq error"""
+    status, name = request.param
+    return FailingChain(groq_error(getattr(groq, name), status))
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_critique_falls_back_on_api_error(rejected, streaming):
+    critic = CriticAgent(on_chunk=(lambda chunk: None) if streaming else None)
+    critic.chain = critic.structured_chain = rejected
+    
+    critique = critic.critique_research(RESEARCH)
+    
+    assert critique == critic._create_default_critique(RESEARCH)
+
+
+def test_async_critique_falls_back_on_api_error(rejected):
+    critic = CriticAgent()
+    critic.chain = critic.structured_chain = rejected
+    
+    critique = asyncio.run(critic.acritique_research(RESEARCH))
+    
+    assert critique == critic._create_default_critique(RESEARCH)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_plan_falls_back_on_api_error(rejected, streaming):
+    planner = TaskPlanner(on_chunk=(lambda chunk: None) if streaming else None)
+    planner.chain = planner.structured_chain = rejected
+    
+    plan = planner.create_plan("Is AI interview prep a good startup idea?")
+    
+    assert plan == planner._create_default_plan("Is AI interview prep a good startup idea?")
+
+
+class FlakyChain:
+    """Runnable whose first call of each kind is rate limited and whose later calls succeed"""
+    
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+    
+    def _fail_first(self):
+        self.calls += 1
+        if self.calls == 1:
+            raise groq_error(groq.RateLimitError, 429)
+    
+    def stream(self, inputs):
+        self._fail_first()
+        yield from self.chunks
+    
+    async def astream(self, inputs):
+        self._fail_first()
+        for chunk in self.chunks:
+            yield chunk
+    
+    def invoke(self, inputs):
+        self._fail_first()
+        return "".join(self.chunks)
+
+
+def test_stream_retries_rate_limit():
+    chain = FlakyChain(["{", "}"])
+    
+    assert list(base_llm.stream_with_retry(chain, {})) == ["{", "}"]
+    assert chain.calls == 2
+
+
+def test_astream_retries_rate_limit():
+    async def collect(chain):
+        return [chunk async for chunk in base_llm.astream_with_retry(chain, {})]
+    
+    chain = FlakyChain(["{", "}"])
+    
+    assert asyncio.run(collect(chain)) == ["{", "}"]
+    assert chain.calls == 2
+
+
+def test_default_results_share_no_nested_objects():
+    critic = CriticAgent()
+    critique = critic._create_default_critique(RESEARCH)
+    critique["validation"]["accuracy_score"] = 0
+    critique["improvements"].clear()
+    
+    planner = TaskPlanner()
+    plan = planner._create_default_plan("problem")
+    plan["subtasks"][0]["task"] = "changed"
+    
+    assert critic._create_default_critique(RESEARCH)["validation"]["accuracy_score"] == 5
+    assert critic._create_default_critique(RESEARCH)["improvements"]
+    assert planner._create_default_plan("problem")["subtasks"][0]["task"] != "changed"
@@ -1,6 +1,6 @@
-from agents.researcher import ResearchAgent
+import pytest
 
-researcher = ResearchAgent()
+from agents.researcher import _optimize_query_cached
 
 test_queries = [
     "is it a good idea to pursue your degree from germany as compared to other european countries",
@@ -9,11 +9,32 @@ test_queries = [
     "is ai interview prep a good startup idea"
 ]
 
-print("🧪 Testing Query Optimizer Fix")
-print("="*60)
 
-for query in test_queries:
-    optimized = researcher._optimize_query(query)
+@pytest.mark.parametrize("query", test_queries)
+def test_optimize_query(query):
+    optimized = _optimize_query_cached(query)
     print(f"\nOriginal: {query}")
     print(f"Optimized: {optimized}")
-    print("-"*40)
\ No newline at end of file
+    print("-"*40)
+    
+    words = f"{query} 2024".split()
+    if len(words) > 15:
+        # Long queries are capped to their first 12 words
+        assert optimized == " ".join(words[:12])
+    else:
+        # Short queries get the year appended for recency
+        assert optimized == f"{query} 2024"
+
+
+@pytest.mark.parametrize("query", ["ev market trends 2023", "AI hiring outlook 2024"])
+def test_optimize_query_keeps_existing_year(query):
+    assert _optimize_query_cached(query) == query
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Query Optimizer Fix")
+    print("="*60)
+    
+    # _optimize_query is a memoized string transform with no network call, so a thread pool would only add overhead
+    for query in test_queries:
+        test_optimize_query(query)
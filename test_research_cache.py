@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("diskcache")
+
+from agents import base_llm
+from agents.researcher import ResearchAgent, _FALLBACK_JSON_STR
+
+TOPIC = "EV market in Europe"
+SEARCH_RESULTS = [{"title": "EV sales", "snippet": "Up 30%", "url": "https://example.com/ev"}]
+VALID_RESPONSE = '{"topic": "EV market in Europe", "summary": "Growing fast"}'
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    """ResearchAgent with canned search results and a throwaway LLM cache; no network call is made"""
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    base_llm._resolve_config.cache_clear()
+    base_llm.get_llm.cache_clear()
+    agent = ResearchAgent(cache_dir=str(tmp_path))
+    agent.search_web = lambda query, max_results=5: SEARCH_RESULTS
+    yield agent
+    base_llm._resolve_config.cache_clear()
+    base_llm.get_llm.cache_clear()
+
+
+def cache_key(agent):
+    return agent._response_key(agent._build_prompt(TOPIC, SEARCH_RESULTS))
+
+
+@pytest.mark.parametrize("response", [
+    _FALLBACK_JSON_STR,
+    '{"topic": "EV market", "summary": "cut off mid',
+    "Error generating response: connection reset"
+], ids=["no-json", "truncated", "llm-error"])
+def test_unusable_response_is_not_cached(agent, response):
+    agent._generate = lambda prompt: response
+    
+    agent.research_topic(TOPIC)
+    
+    assert agent.cache.backend.get(cache_key(agent)) is None
+
+
+def test_valid_response_is_cached_and_reused(agent):
+    calls = []
+    agent._generate = lambda prompt: calls.append(prompt) or VALID_RESPONSE
+    
+    first = agent.research_topic(TOPIC)
+    second = agent.research_topic(TOPIC)
+    
+    assert first["summary"] == second["summary"] == "Growing fast"
+    assert agent.cache.backend.get(cache_key(agent)) == VALID_RESPONSE
+    assert len(calls) == 1
+
+
+def test_async_research_caches_only_valid_responses(agent):
+    async def search(query, max_results=5):
+        return SEARCH_RESULTS
+    
+    async def generate(prompt):
+        return _FALLBACK_JSON_STR
+    
+    agent.search_web_async = search
+    agent._agenerate = generate
+    
+    asyncio.run(agent.research_topic_async(TOPIC))
+    
+    assert agent.cache.backend.get(cache_key(agent)) is None
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("diskcache")
+
+from agents import base_llm
+from agents import researcher as researcher_module
+from agents.researcher import ResearchAgent
+
+EMPTY_RESPONSE = {"search_metadata": {"status": "Success"}, "organic_results": []}
+RESPONSE = {
+    "search_metadata": {"status": "Success"},
+    "organic_results": [{"title": "EV sales", "snippet": "Up 30%", "link": "https://example.com/ev"}]
+}
+
+
+class FakeResponse:
+    """Minimal stand-in for a requests/httpx response"""
+    
+    def __init__(self, payload):
+        self.payload = payload
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Records every SerpAPI request and answers with a fixed payload"""
+    
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+    
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return FakeResponse(self.payload)
+
+
+class FakeAsyncClient(FakeSession):
+    async def get(self, url, params=None, timeout=None):
+        return FakeSession.get(self, url, params, timeout)
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    """ResearchAgent with a SERP key and a throwaway SERP cache; no LLM call is made"""
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(researcher_module, "_load_serp_key", lambda: "serp-key")
+    base_llm._resolve_config.cache_clear()
+    base_llm.get_llm.cache_clear()
+    agent = ResearchAgent(cache_dir=str(tmp_path))
+    yield agent
+    base_llm._resolve_config.cache_clear()
+    base_llm.get_llm.cache_clear()
+
+
+@pytest.mark.parametrize("payload", [RESPONSE, EMPTY_RESPONSE], ids=["results", "no-results"])
+def test_repeated_search_is_served_from_disk(agent, monkeypatch, payload):
+    session = FakeSession(payload)
+    monkeypatch.setattr(researcher_module, "_serp_session", lambda: session)
+    
+    first = agent.search_web("ev market", max_results=3)
+    second = agent.search_web("ev market", max_results=3)
+    
+    assert first == second == agent._parse_serp_results(payload, 3)
+    assert session.calls == 1
+
+
+def test_async_search_shares_the_cache(agent, monkeypatch):
+    session, client = FakeSession(RESPONSE), FakeAsyncClient(RESPONSE)
+    monkeypatch.setattr(researcher_module, "_serp_session", lambda: session)
+    monkeypatch.setattr(researcher_module, "_serp_async_client", lambda: client)
+    
+    agent.search_web("ev market", max_results=3)
+    results = asyncio.run(agent.search_web_async("ev market", max_results=3))
+    
+    assert results[0]["url"] == "https://example.com/ev"
+    assert (session.calls, client.calls) == (1, 0)
+
+
+def test_concurrent_queries_are_cached_per_query(agent, monkeypatch):
+    client = FakeAsyncClient(RESPONSE)
+    monkeypatch.setattr(researcher_module, "_serp_async_client", lambda: client)
+    queries = ["ev market", "ev charging", "ev batteries", "ev market"]
+    
+    async def search_all():
+        return await asyncio.gather(*(agent.search_web_async(query, max_results=3) for query in queries))
+    
+    first = asyncio.run(search_all())
+    calls = client.calls
+    second = asyncio.run(search_all())
+    
+    assert first == second == [agent._parse_serp_results(RESPONSE, 3)] * len(queries)
+    assert 3 <= calls <= len(queries)
+    assert client.calls == calls
+    assert agent.serp_cache.get(agent._serp_key(agent._build_serp_params("ev charging", 3))) == RESPONSE
+
+
+def test_failed_search_is_not_cached(agent, monkeypatch):
+    session = FakeSession({"error": "Invalid API key."})
+    monkeypatch.setattr(researcher_module, "_serp_session", lambda: session)
+    
+    agent.search_web("ev market", max_results=3)
+    agent.search_web("ev market", max_results=3)
+    
+    assert session.calls == 2
+
+
+def test_cache_key_ignores_the_api_key(agent):
+    params = agent._build_serp_params("ev market", 3)
+    
+    assert agent._serp_key(params) == agent._serp_key({**params, "api_key": "other-key"})
+    assert agent._serp_key(params) != agent._serp_key({**params, "num": 5})